@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Analytics benchmark for Symptom Tracker
+Times the dashboard.py functions on a synthetic multi-year history and,
+optionally, the same calls against dashboard.py from another git revision
+
+Usage:
+    python benchmarks/bench_analytics.py --years 10
+    python benchmarks/bench_analytics.py --years 10 --baseline HEAD~1
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+import types
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from history import synthetic_history
+
+
+def load_baseline(revision):
+    """Import dashboard.py as it was at a git revision"""
+    source = subprocess.run(
+        ['git', 'show', f'{revision}:dashboard.py'],
+        cwd=REPO_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    module = types.ModuleType(f'dashboard_{revision}')
+    exec(compile(source, f'{revision}:dashboard.py', 'exec'), module.__dict__)
+    return module
+
+
+def time_call(func, repeat):
+    """Return the best wall time of func() over repeat runs, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run_separately(module, data):
+    """Call the four analytics functions one after another, as separate callers would"""
+    module.get_dashboard_stats(data)
+    module.generate_timeline_data(data)
+    module.get_cycle_analysis(data)
+    module.get_symptom_trends(data, 'Stoelgang')
+
+
+def main():
+    """Run the benchmark and print a comparison table"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=float, default=10, help='years of daily entries to generate')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement (best is reported)')
+    parser.add_argument('--baseline', help='git revision of dashboard.py to compare against')
+    args = parser.parse_args()
+
+    import dashboard
+
+    data = synthetic_history(args.years)
+    print(f"📊 {len(data)} days of synthetic history ({args.years:g} years)")
+
+    results = {
+        'current: four functions': time_call(lambda: run_separately(dashboard, data), args.repeat),
+        'current: compute_analytics': time_call(
+            lambda: dashboard.compute_analytics(data, trend_symptoms=('Stoelgang',)), args.repeat
+        )
+    }
+    if args.baseline:
+        baseline = load_baseline(args.baseline)
+        results[f'{args.baseline}: four functions'] = time_call(lambda: run_separately(baseline, data), args.repeat)
+
+    reference = max(results.values())
+    for name, elapsed in results.items():
+        print(f"  {name:<40} {elapsed:9.1f} ms  ({reference / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for Symptom Tracker
+For each synthetic history size (see history.py) it times every
+dashboard.py function, load_symptoms/save_symptoms, and every Flask route
+through the test client (p50/p99 latency and throughput). It also times
+the cold start of a fresh worker process (importing flask_app and serving
+the first request). Results are written as JSON so runs from different
+commits can be compared.
+
+Usage:
+    python benchmarks/bench_suite.py --output bench.json
+    python benchmarks/bench_suite.py --years 1 5 --requests 50 --output new.json --compare bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from history import DEFAULT_YEARS, write_history
+
+
+def measure(func, repeat):
+    """Run func repeat times and return min/median wall time in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'min_ms': round(timings[0], 3),
+        'median_ms': round(timings[len(timings) // 2], 3),
+        'runs': repeat
+    }
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def function_cases(dashboard, flask_app, path, data):
+    """Return {name: callable} for every dashboard.py function and the app's load/save"""
+    dates = sorted(data)
+    symptoms = [symptom for entries in data.values() for symptom in entries[-1].get('symptoms', [])]
+    counter = dashboard.get_dashboard_stats(data)['symptom_frequency']
+    timeline = dashboard.generate_timeline_data(data)
+    aggregates = dashboard.DashboardAggregates()
+    aggregates.rebuild(data)
+    last_date = dates[-1]
+
+    def reload_symptoms():
+        # Bump the mtime so the store's stat cache has to re-read the file
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+        flask_app.load_symptoms()
+
+    cases = {
+        'load_symptoms_data': lambda: dashboard.load_symptoms_data(path),
+        'iter_symptoms_data': lambda: sum(1 for _ in dashboard.iter_symptoms_data(path)),
+        'most_common': lambda: dashboard.most_common(counter),
+        'date_ordinal (all dates)': lambda: [dashboard.date_ordinal(date) for date in dates],
+        'split_symptom (all symptoms)': lambda: [dashboard.split_symptom(symptom) for symptom in symptoms],
+        'compute_analytics': lambda: dashboard.compute_analytics(data, trend_symptoms=('Stoelgang',)),
+        'get_dashboard_stats': lambda: dashboard.get_dashboard_stats(data),
+        'get_dashboard_stats (aggregates)': lambda: dashboard.get_dashboard_stats(data, aggregates),
+        'get_symptom_trends': lambda: dashboard.get_symptom_trends(data, 'Stoelgang'),
+        'generate_timeline_data': lambda: dashboard.generate_timeline_data(data),
+        'generate_timeline_data (compact)': lambda: dashboard.generate_timeline_data(data, compact=True),
+        'encode_timeline': lambda: dashboard.encode_timeline(timeline),
+        'get_cycle_analysis': lambda: dashboard.get_cycle_analysis(data),
+        'DashboardAggregates.rebuild': lambda: dashboard.DashboardAggregates().rebuild(data),
+        'DashboardAggregates.apply': lambda: aggregates.apply(last_date, data[last_date], data[last_date]),
+        'DashboardAggregates.to_stats': lambda: aggregates.to_stats(data),
+        'DashboardAggregates.verify': lambda: aggregates.verify(data),
+        'load_symptoms (cached)': flask_app.load_symptoms,
+        'load_symptoms (reload)': reload_symptoms,
+        'save_symptoms': lambda: flask_app.save_symptoms(data),
+    }
+    return cases
+
+
+def route_cases(data):
+    """Return {rule: (method, url, body)} exercising every route
+
+    Dict bodies are sent as JSON, string bodies as is.
+    """
+    dates = sorted(data)
+    first, middle, last = dates[0], dates[len(dates) // 2], dates[-1]
+    recent = dates[max(0, len(dates) - 30):]
+    import_body = ''.join(json.dumps({'date': date, 'entries': data[date]}) + '\n' for date in recent)
+    return {
+        '/': ('GET', '/', None),
+        '/api/symptoms': ('GET', f'/api/symptoms?date={middle}', None),
+        '/api/symptoms [POST]': ('POST', '/api/symptoms', {
+            'date': last,
+            'symptoms': data[last][-1]['symptoms'],
+            'cycleDay': data[last][-1].get('cycleDay'),
+            'comment': data[last][-1].get('comment', '')
+        }),
+        '/api/symptoms/range': ('GET', f'/api/symptoms/range?from={dates[max(0, len(dates) - 30)]}&to={last}', None),
+        '/api/timeline': ('GET', f'/api/timeline?from={dates[max(0, len(dates) - 60)]}&to={last}', None),
+        '/api/trends': ('GET', f'/api/trends?symptom=Sport&from={first}&to={last}', None),
+        '/api/analytics/window': ('GET', f'/api/analytics/window?from={middle}&to={last}', None),
+        '/api/analytics/rolling': ('GET', f'/api/analytics/rolling?to={last}', None),
+        '/api/correlations': ('GET', f'/api/correlations?lag=1&lag=7&from={first}&to={last}', None),
+        '/api/all-dates': ('GET', '/api/all-dates', None),
+        '/api/all-dates [page]': ('GET', f'/api/all-dates?limit=100&cursor={middle}', None),
+        '/api/last-cycle-day': ('GET', '/api/last-cycle-day', None),
+        '/dashboard': ('GET', '/dashboard', None),
+        '/health': ('GET', '/health', None),
+        '/metrics': ('GET', '/metrics', None),
+        '/api/export': ('GET', '/api/export', None),
+        '/api/export [csv]': ('GET', '/api/export?format=csv', None),
+        '/api/import': ('POST', '/api/import', import_body),
+    }
+
+
+def bench_routes(app, cases, requests):
+    """Time each route case through the test client"""
+    client = app.test_client()
+    results = {}
+    for name, (method, url, body) in cases.items():
+        # One untimed request warms caches and the background stats snapshot
+        kwargs = {'json': body} if isinstance(body, dict) else {'data': body}
+        client.open(url, method=method, buffered=True, **kwargs).close()
+        timings = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            # buffered=True consumes streamed bodies inside the timed section
+            response = client.open(url, method=method, buffered=True, **kwargs)
+            timings.append((time.perf_counter() - start) * 1000)
+            response.close()
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method} {url} returned {response.status_code}")
+        total = sum(timings)
+        timings.sort()
+        results[name] = {
+            'requests': requests,
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'mean_ms': round(total / requests, 3),
+            'throughput_rps': round(requests / (total / 1000), 1)
+        }
+    return results
+
+
+COLD_START_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import flask_app
+imported = time.perf_counter()
+flask_app.app.test_client().get(sys.argv[1]).close()
+done = time.perf_counter()
+print(json.dumps({'import_ms': (imported - start) * 1000, 'first_request_ms': (done - imported) * 1000}))
+'''
+
+
+def bench_cold_start(url, runs):
+    """Time importing flask_app and its first request in fresh interpreters (median of runs)"""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', COLD_START_SCRIPT, url], cwd=REPO_DIR,
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    result = {'url': url, 'runs': runs}
+    for key in ('import_ms', 'first_request_ms'):
+        values = sorted(sample[key] for sample in samples)
+        result[key] = round(values[len(values) // 2], 3)
+    totals = sorted(sample['import_ms'] + sample['first_request_ms'] for sample in samples)
+    result['total_ms'] = round(totals[len(totals) // 2], 3)
+    return result
+
+
+def git_commit():
+    """Return the current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Print metrics that got slower (or faster) than in a previous results file"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    print(f"\n🔍 Compared with {baseline_path} ({(baseline['meta'].get('commit') or '?')[:10]})")
+    for name, values in results.get('startup', {}).items():
+        old = baseline.get('startup', {}).get(name)
+        if not old or not old['total_ms']:
+            continue
+        ratio = values['total_ms'] / old['total_ms']
+        if ratio >= threshold or ratio <= 1 / threshold:
+            marker = '🔴' if ratio > 1 else '🟢'
+            print(f"  {marker} cold start {name:<29} {old['total_ms']:10.2f} -> {values['total_ms']:10.2f} ms ({ratio:.2f}x)")
+    for size, current in results['sizes'].items():
+        previous = baseline['sizes'].get(size)
+        if previous is None:
+            continue
+        for group, metric in (('functions', 'median_ms'), ('routes', 'p50_ms')):
+            for name, values in current[group].items():
+                old = previous[group].get(name)
+                if not old or not old[metric]:
+                    continue
+                ratio = values[metric] / old[metric]
+                if ratio >= threshold or ratio <= 1 / threshold:
+                    marker = '🔴' if ratio > 1 else '🟢'
+                    print(f"  {marker} {size} {name:<40} {old[metric]:10.2f} -> {values[metric]:10.2f} ms ({ratio:.2f}x)")
+
+
+def main():
+    """Run the suite and write the results as JSON"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=float, nargs='+', default=DEFAULT_YEARS, help='history lengths to benchmark')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per function measurement')
+    parser.add_argument('--requests', type=int, default=100, help='requests per route')
+    parser.add_argument('--storage', choices=('json', 'journal'), default='json', help='storage backend')
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='previous results file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.1, help='ratio reported by --compare')
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='symptom-bench-')
+    os.environ['SYMPTOM_DATA_DIR'] = data_dir
+    os.environ['SYMPTOM_CACHE_DIR'] = os.path.join(data_dir, 'cache')
+    os.environ['SYMPTOM_STORAGE'] = args.storage
+    import dashboard
+    import flask_app
+    path = flask_app.SYMPTOM_FILE
+
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'storage': args.storage,
+            'repeat': args.repeat,
+            'requests': args.requests
+        },
+        'startup': {},
+        'sizes': {}
+    }
+
+    for years in args.years:
+        size = f"{years:g}y"
+        if args.storage == 'journal':
+            # Start from a clean journal so the history file is the whole log
+            open(flask_app.store.journal_path, 'w').close()
+        data = write_history(path, years)
+        data = flask_app.load_symptoms()
+        print(f"📊 {size}: {len(data)} days, {os.path.getsize(path) / 1e6:.1f} MB")
+
+        functions = {name: measure(func, args.repeat)
+                     for name, func in function_cases(dashboard, flask_app, path, data).items()}
+        for name, timing in functions.items():
+            print(f"  {name:<40} {timing['median_ms']:10.2f} ms")
+
+        cases = route_cases(data)
+        rules = {rule.rule for rule in flask_app.app.url_map.iter_rules() if rule.endpoint != 'static'}
+        missing = rules - {name.split(' [')[0] for name in cases}
+        if missing:
+            print(f"⚠️ No benchmark for: {', '.join(sorted(missing))}")
+        routes = bench_routes(flask_app.app, cases, args.requests)
+        for name, timing in routes.items():
+            print(f"  {name:<40} p50 {timing['p50_ms']:8.2f} ms  p99 {timing['p99_ms']:8.2f} ms  "
+                  f"{timing['throughput_rps']:8.1f} req/s")
+
+        results['sizes'][size] = {
+            'days': len(data),
+            'file_bytes': os.path.getsize(path),
+            'functions': functions,
+            'routes': routes
+        }
+
+        # Fresh worker against this data: import plus first /dashboard request
+        startup = bench_cold_start('/dashboard', args.repeat)
+        results['startup'][size] = startup
+        print(f"  {'cold start (import + /dashboard)':<40} {startup['import_ms']:8.2f} + "
+              f"{startup['first_request_ms']:8.2f} = {startup['total_ms']:8.2f} ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
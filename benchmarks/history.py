@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Synthetic symptom history for the Symptom Tracker benchmarks
+Generates daily entries with the symptom and dropdown vocabulary of
+templates/index.html, reproducibly from a seed
+
+Usage:
+    python benchmarks/history.py --out /tmp/histories
+    python benchmarks/history.py --years 1 5 --out /tmp/histories
+"""
+
+import argparse
+import json
+import os
+import random
+from datetime import date, timedelta
+
+# Checkboxes on the entry form
+SYMPTOMS = ['Buikpijn', 'Laxeermiddel', 'Kine/Osteo']
+
+# Checkboxes with a type dropdown, saved as 'Base: type' (or just 'Base'
+# when no type was selected)
+DROPDOWNS = {
+    'Stoelgang': ['Goed', 'Pijnlijk'],
+    'Betrekkingen': ['Goed', 'Pijnlijk'],
+    'Sport': ['Zwemmen', 'Krachttraining', 'Wandelen', 'Fietsen']
+}
+
+COMMENTS = ['Slecht geslapen', 'Veel stress op het werk', 'Voelde me goed', 'Hoofdpijn in de avond']
+
+DEFAULT_YEARS = (1, 5, 20, 100)
+
+
+def synthetic_history(years, seed=42, end=None):
+    """Build a symptom log covering the given number of years up to end (default today)
+
+    Like real use: a few days are skipped, cycle lengths vary between 26
+    and 32 days, some dropdowns are left empty and a few entries have a
+    comment. cycleDay is always present because the form always sends it.
+    """
+    rng = random.Random(seed)
+    end = end or date.today()
+    data = {}
+    day = end - timedelta(days=int(years * 365))
+    cycle_day = 1
+    cycle_length = 28
+    while day <= end:
+        if rng.random() >= 0.05:
+            symptoms = [s for s in SYMPTOMS if rng.random() < 0.3]
+            for base, types_ in DROPDOWNS.items():
+                if rng.random() < 0.3:
+                    symptoms.append(base if rng.random() < 0.05 else f"{base}: {rng.choice(types_)}")
+            entry = {
+                'datetime': f"{day} {rng.randint(7, 23):02d}:{rng.randint(0, 59):02d}:00",
+                'symptoms': symptoms,
+                'cycleDay': min(cycle_day, 28)
+            }
+            if rng.random() < 0.1:
+                entry['comment'] = rng.choice(COMMENTS)
+            data[day.strftime('%Y-%m-%d')] = [entry]
+
+        cycle_day += 1
+        if cycle_day > cycle_length:
+            cycle_day = 1
+            cycle_length = rng.randint(26, 32)
+        day += timedelta(days=1)
+    return data
+
+
+def write_history(path, years, seed=42):
+    """Write a synthetic symptom_log.json the way the app saves it; returns the data"""
+    data = synthetic_history(years, seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return data
+
+
+def main():
+    """Write one symptom_log.json per requested history length"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=float, nargs='+', default=DEFAULT_YEARS, help='history lengths to generate')
+    parser.add_argument('--seed', type=int, default=42, help='random seed')
+    parser.add_argument('--out', default='.', help='output directory')
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for years in args.years:
+        path = os.path.join(args.out, f"symptom_log_{years:g}y.json")
+        data = write_history(path, years, args.seed)
+        print(f"✅ {path}: {len(data)} days, {os.path.getsize(path) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
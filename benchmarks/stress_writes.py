@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Concurrent write stress test for Symptom Tracker
+Starts several processes that POST to /api/symptoms through the Flask test
+client against one shared data directory, then checks that no entries were lost
+
+Usage:
+    python benchmarks/stress_writes.py --processes 8 --writes 50 --storage json
+    python benchmarks/stress_writes.py --storage journal --write-behind
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+START_DATE = date(2000, 1, 1)
+
+
+def worker_date(worker_id, index, writes):
+    """Return the unique date written by a worker for a given write index"""
+    return (START_DATE + timedelta(days=worker_id * writes + index)).strftime('%Y-%m-%d')
+
+
+def writer(worker_id, writes, barrier, results):
+    """POST one entry per date and report the elapsed time"""
+    sys.path.insert(0, REPO_DIR)
+    import flask_app
+
+    client = flask_app.app.test_client()
+    failures = 0
+    barrier.wait()
+    start = time.perf_counter()
+    for index in range(writes):
+        response = client.post('/api/symptoms', json={
+            'date': worker_date(worker_id, index, writes),
+            'symptoms': ['Buikpijn', f'Worker: {worker_id}'],
+            'cycleDay': index % 28 + 1
+        })
+        if response.status_code != 200:
+            failures += 1
+    elapsed = time.perf_counter() - start
+    # Write out queued write-behind saves like a clean shutdown would
+    flask_app.default_shard.flush()
+    results.put(('writer', worker_id, elapsed, failures))
+
+
+def reader(stop, barrier, results):
+    """Poll /api/all-dates and count responses where history shrank"""
+    sys.path.insert(0, REPO_DIR)
+    import flask_app
+
+    client = flask_app.app.test_client()
+    shrinks = 0
+    reads = 0
+    previous = 0
+    barrier.wait()
+    while not stop.is_set():
+        count = len(client.get('/api/all-dates').get_json())
+        if count < previous:
+            shrinks += 1
+        previous = count
+        reads += 1
+    results.put(('reader', reads, shrinks, 0))
+
+
+def main():
+    """Run the stress test and print a summary"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=8, help='number of writer processes')
+    parser.add_argument('--writes', type=int, default=50, help='POSTs per writer process')
+    parser.add_argument('--readers', type=int, default=2, help='number of concurrent reader processes')
+    parser.add_argument('--storage', default='json', help='storage backend: json, journal or sqlite')
+    parser.add_argument('--write-behind', action='store_true', help='save through the write-behind queue')
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='symptom-stress-')
+    os.environ['SYMPTOM_DATA_DIR'] = data_dir
+    os.environ['SYMPTOM_CACHE_DIR'] = os.path.join(data_dir, 'cache')
+    os.environ['SYMPTOM_STORAGE'] = args.storage
+    if args.write_behind:
+        os.environ['SYMPTOM_WRITE_BEHIND'] = '1'
+
+    ctx = multiprocessing.get_context('spawn')
+    barrier = ctx.Barrier(args.processes + args.readers + 1)
+    results = ctx.Queue()
+    stop = ctx.Event()
+
+    writers = [ctx.Process(target=writer, args=(i, args.writes, barrier, results)) for i in range(args.processes)]
+    readers = [ctx.Process(target=reader, args=(stop, barrier, results)) for _ in range(args.readers)]
+    for process in writers + readers:
+        process.start()
+
+    barrier.wait()
+    start = time.perf_counter()
+    writer_results = [results.get() for _ in writers]
+    elapsed = time.perf_counter() - start
+    stop.set()
+    reader_results = [results.get() for _ in readers]
+    for process in writers + readers:
+        process.join()
+
+    # Verify every write made it to disk with a fresh store
+    sys.path.insert(0, REPO_DIR)
+    from symptom_store import open_store
+    path = os.path.join(data_dir, 'symptom_log.db' if args.storage == 'sqlite' else 'symptom_log.json')
+    data = open_store(path, args.storage).load()
+    expected = {worker_date(w, i, args.writes) for w in range(args.processes) for i in range(args.writes)}
+    lost = sorted(expected - set(data))
+    failures = sum(r[3] for r in writer_results)
+    total = args.processes * args.writes
+
+    print(f"📁 Data directory: {data_dir} ({args.storage}{', write-behind' if args.write_behind else ''})")
+    print(f"✍️  {total} POSTs from {args.processes} processes in {elapsed:.2f}s "
+          f"({total / elapsed:.0f} writes/s)")
+    print(f"📖 {sum(r[1] for r in reader_results)} concurrent reads, "
+          f"{sum(r[2] for r in reader_results)} saw history shrink")
+    if failures:
+        print(f"⚠️  {failures} requests returned an error")
+    if lost:
+        print(f"❌ Lost {len(lost)} entries, e.g. {lost[:5]}")
+        sys.exit(1)
+    print("✅ No entries lost")
+
+
+if __name__ == "__main__":
+    main()
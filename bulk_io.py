@@ -0,0 +1,230 @@
+#!/usr/bin/python3.10
+
+"""
+Bulk import and export for Symptom Tracker
+Streams the symptom log out as NDJSON or CSV a chunk of dates at a time,
+and applies uploaded NDJSON or CSV in batches of dates with one write
+(and one fsync) per batch.
+
+NDJSON: one line per date, {"date": "YYYY-MM-DD", "entries": [...]}. An
+import line may also be a single entry with a "date" key.
+CSV: one row per entry with the columns below, symptoms joined by ';'.
+"""
+
+import csv
+from datetime import datetime
+import io
+import json
+
+from symptom_vocab import normalize_symptoms
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+CSV_COLUMNS = ('date', 'datetime', 'cycleDay', 'symptoms', 'comment')
+SYMPTOM_SEPARATOR = ';'
+
+# Dates fetched from the store per export chunk
+EXPORT_CHUNK_DATES = 500
+# Approximate bytes per yielded response chunk
+EXPORT_BUFFER_BYTES = 64 * 1024
+# Dates written per import batch (one store write each)
+IMPORT_BATCH_DATES = 5000
+# Errors listed in the import summary (all are counted)
+MAX_REPORTED_ERRORS = 20
+# Largest cycleDay accepted on import and save (the form allows 1-28)
+MAX_CYCLE_DAY = 100
+
+
+def iter_export_pairs(store, start=None, end=None):
+    """Yield (date, entries) in date order, fetching EXPORT_CHUNK_DATES dates at a time"""
+    cursor = None
+    while True:
+        dates = store.dates_between(start, end, after=cursor, limit=EXPORT_CHUNK_DATES)
+        if not dates:
+            return
+        yield from store.get_range(dates[0], dates[-1]).items()
+        cursor = dates[-1]
+
+
+def _buffered(pieces):
+    """Join small string pieces into chunks of about EXPORT_BUFFER_BYTES"""
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= EXPORT_BUFFER_BYTES:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def export_ndjson(pairs):
+    """Yield NDJSON text chunks, one line per date"""
+    return _buffered(json.dumps({'date': date, 'entries': entries}, ensure_ascii=False) + '\n'
+                     for date, entries in pairs)
+
+
+def export_csv(pairs):
+    """Yield CSV text chunks, a header and one row per entry"""
+    def rows():
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(CSV_COLUMNS)
+        for date, entries in pairs:
+            for entry in entries:
+                cycle_day = entry.get('cycleDay')
+                writer.writerow([
+                    date,
+                    entry.get('datetime', ''),
+                    '' if cycle_day is None else cycle_day,
+                    SYMPTOM_SEPARATOR.join(entry.get('symptoms', [])),
+                    entry.get('comment', '')
+                ])
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+    return _buffered(rows())
+
+
+def _normalize_date(value):
+    """Return value as 'YYYY-MM-DD', raising ValueError if it is not a date"""
+    if not isinstance(value, str):
+        raise ValueError("date must be a 'YYYY-MM-DD' string")
+    return datetime.strptime(value.strip(), '%Y-%m-%d').strftime('%Y-%m-%d')
+
+
+def normalize_cycle_day(value):
+    """Return a cycleDay as an int in 1..MAX_CYCLE_DAY, None if empty; raise ValueError otherwise
+
+    Accepts ints, integral floats and numeric strings (CSV cells, form
+    values), since the analytics only count integer cycle days.
+    """
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, bool):
+        raise ValueError("cycleDay must be a whole number")
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError("cycleDay must be a whole number")
+        value = int(value)
+    elif isinstance(value, str):
+        try:
+            value = int(value.strip())
+        except ValueError:
+            raise ValueError("cycleDay must be a whole number") from None
+    elif not isinstance(value, int):
+        raise ValueError("cycleDay must be a whole number")
+    if not 1 <= value <= MAX_CYCLE_DAY:
+        raise ValueError(f"cycleDay must be between 1 and {MAX_CYCLE_DAY}")
+    return value
+
+
+def _normalize_entry(entry):
+    """Clean one imported entry the way POST /api/symptoms builds it"""
+    if not isinstance(entry, dict):
+        raise ValueError("entry must be an object")
+    entry = {key: value for key, value in entry.items() if key != 'date'}
+    symptoms = entry.get('symptoms', [])
+    if not isinstance(symptoms, list):
+        raise ValueError("symptoms must be a list")
+    entry['symptoms'] = normalize_symptoms(symptoms)
+    entry.setdefault('datetime', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+    cycle_day = normalize_cycle_day(entry.get('cycleDay'))
+    if cycle_day is None:
+        entry.pop('cycleDay', None)
+    else:
+        entry['cycleDay'] = cycle_day
+
+    comment = entry.get('comment')
+    if isinstance(comment, str) and comment.strip():
+        entry['comment'] = comment.strip()
+    else:
+        entry.pop('comment', None)
+    return entry
+
+
+def parse_ndjson(lines):
+    """Yield (line_number, date, entries, replace, error) for NDJSON lines
+
+    A {"date", "entries"} line replaces the date (replace=True); a single
+    entry line adds one entry to it.
+    """
+    for line_number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("line must be a JSON object")
+            date = _normalize_date(record.get('date'))
+            if 'entries' in record:
+                if not isinstance(record['entries'], list):
+                    raise ValueError("entries must be a list")
+                yield line_number, date, [_normalize_entry(entry) for entry in record['entries']], True, None
+            else:
+                yield line_number, date, [_normalize_entry(record)], False, None
+        except (ValueError, TypeError, OverflowError) as e:
+            yield line_number, None, None, False, str(e)
+
+
+def parse_csv(lines):
+    """Yield (line_number, date, entries, replace, error) for CSV rows (one entry each)"""
+    text_lines = (line.decode('utf-8') if isinstance(line, bytes) else line for line in lines)
+    reader = csv.DictReader(text_lines)
+    for row in reader:
+        line_number = reader.line_num
+        try:
+            date = _normalize_date(row.get('date'))
+            symptoms = [s for s in (row.get('symptoms') or '').split(SYMPTOM_SEPARATOR) if s.strip()]
+            entry = {'symptoms': symptoms, 'cycleDay': row.get('cycleDay'), 'comment': row.get('comment') or ''}
+            if row.get('datetime'):
+                entry['datetime'] = row['datetime']
+            yield line_number, date, [_normalize_entry(entry)], False, None
+        except (ValueError, TypeError, OverflowError) as e:
+            yield line_number, None, None, False, str(e)
+
+
+def import_records(store, records, batch_size=IMPORT_BATCH_DATES):
+    """Write parsed records to the store in batches of dates and return a summary
+
+    The first record of a date in an import replaces what is stored for
+    it; further entry records for that date are appended.
+    """
+    pending = {}
+    seen = set()
+    summary = {'importedDates': 0, 'importedEntries': 0, 'batches': 0, 'errorCount': 0, 'errors': []}
+
+    def flush():
+        store.put_many(pending)
+        summary['batches'] += 1
+        pending.clear()
+
+    for line_number, date, entries, replace, error in records:
+        if error is not None:
+            summary['errorCount'] += 1
+            if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                summary['errors'].append({'line': line_number, 'message': error})
+            continue
+
+        summary['importedEntries'] += len(entries)
+        if replace or date not in seen:
+            pending[date] = entries
+        elif date in pending:
+            pending[date] = pending[date] + entries
+        else:
+            # Continues a date written by an earlier batch
+            pending[date] = list(store.get(date)) + entries
+        seen.add(date)
+
+        if len(pending) >= batch_size:
+            flush()
+
+    if pending:
+        flush()
+    summary['importedDates'] = len(seen)
+    return summary
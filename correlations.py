@@ -0,0 +1,212 @@
+#!/usr/bin/python3.10
+
+"""
+Symptom correlations for Symptom Tracker
+Co-occurrence of symptoms on the same day, lagged associations (symptom A
+on day d, symptom B on day d+k) and symptom/cycle day associations.
+
+The day x symptom matrix is kept as one int bitset per symptom (bit i set
+when the symptom was logged on day first + i), so a pair count is a single
+AND and bit_count() over the whole history, a lag is a shift, and a date
+window is a mask. The bitsets are built once per data version and the
+results of recent queries are cached with it.
+"""
+
+from collections import OrderedDict
+from math import sqrt
+
+from dashboard import date_ordinal
+from symptom_vocab import SymptomVocabulary
+
+GROUPINGS = ('symptom', 'base')
+# Query results kept per data version
+RESULT_CACHE_SIZE = 32
+
+
+class SymptomBitsets:
+    """Bitsets of one data version: logged days, each symptom and each cycle day
+
+    Like the dashboard, a date counts with the symptoms and cycleDay of its
+    latest entry. Dates that are not 'YYYY-MM-DD' are left out.
+    """
+
+    def __init__(self, data, vocabulary=None):
+        if vocabulary is None:
+            vocabulary = SymptomVocabulary()
+        self.vocabulary = vocabulary
+        days = []
+        for date, entries in data.items():
+            ordinal = date_ordinal(date)
+            if ordinal is None or not entries or not isinstance(entries, list):
+                continue
+            days.append((ordinal, entries[-1]))
+
+        self.first = min(ordinal for ordinal, _ in days) if days else 0
+        self.size = max(ordinal for ordinal, _ in days) - self.first + 1 if days else 0
+
+        logged = []
+        records = {}
+        cycle_days = {}
+        for ordinal, latest_entry in days:
+            index = ordinal - self.first
+            logged.append(index)
+            for symptom in latest_entry.get('symptoms', []):
+                if isinstance(symptom, str):
+                    records.setdefault(vocabulary.record(symptom).id, []).append(index)
+            cycle_day = latest_entry.get('cycleDay')
+            if isinstance(cycle_day, int) and not isinstance(cycle_day, bool):
+                cycle_days.setdefault(cycle_day, []).append(index)
+
+        self.logged = self._bits(logged)
+        self.records = {record_id: self._bits(indexes) for record_id, indexes in records.items()}
+        self.cycle_days = {cycle_day: self._bits(indexes) for cycle_day, indexes in sorted(cycle_days.items())}
+
+    def _bits(self, indexes):
+        """Return an int with the given bit indexes set"""
+        buffer = bytearray((self.size + 7) // 8)
+        for index in indexes:
+            buffer[index >> 3] |= 1 << (index & 7)
+        return int.from_bytes(buffer, 'little')
+
+    def grouped(self, by='symptom'):
+        """Return {name: bitset} per symptom string, or per base symptom (types OR-ed together)"""
+        vocabulary = self.vocabulary
+        groups = {}
+        for record_id, bits in self.records.items():
+            record = vocabulary.by_id[record_id]
+            name = record.raw if by == 'symptom' else vocabulary.bases[record.base_id]
+            groups[name] = groups.get(name, 0) | bits
+        return dict(sorted(groups.items()))
+
+    def window_mask(self, start=None, end=None):
+        """Return the mask of the days in [start, end] (either may be None)
+
+        Raises ValueError for dates that are not 'YYYY-MM-DD'.
+        """
+        for date in (start, end):
+            if date is not None and date_ordinal(date) is None:
+                raise ValueError(f"Invalid date: {date}")
+        lo = 0 if start is None else max(date_ordinal(start) - self.first, 0)
+        hi = self.size if end is None else min(date_ordinal(end) - self.first + 1, self.size)
+        if lo >= hi:
+            return 0
+        return ((1 << (hi - lo)) - 1) << lo
+
+
+def _ratio(numerator, denominator):
+    """Return numerator / denominator rounded for JSON, None if undefined"""
+    return round(numerator / denominator, 4) if denominator else None
+
+
+def _phi(both, count_a, count_b, total):
+    """Phi coefficient of two binary day series from their 2x2 table counts"""
+    denominator = count_a * (total - count_a) * count_b * (total - count_b)
+    if not denominator:
+        return None
+    return round((total * both - count_a * count_b) / sqrt(denominator), 4)
+
+
+def compute_correlations(bitsets, start=None, end=None, lags=(1,), by='symptom'):
+    """Return co-occurrence, lagged and cycle day association matrices
+
+    Rows and columns follow result['symptoms']. Lifts compare the observed
+    count with the count expected if the two were independent (1 = no
+    association); lagged counts only use day pairs where both days were
+    logged.
+    """
+    mask = bitsets.window_mask(start, end)
+    logged = bitsets.logged & mask
+    total = logged.bit_count()
+    groups = {name: bits & mask for name, bits in bitsets.grouped(by).items()}
+    groups = {name: bits for name, bits in groups.items() if bits}
+    names = list(groups)
+    series = list(groups.values())
+    counts = [bits.bit_count() for bits in series]
+
+    both = [[(a & b).bit_count() for b in series] for a in series]
+    result = {
+        'days': total,
+        'symptoms': names,
+        'symptom_days': counts,
+        'cooccurrence': {
+            'counts': both,
+            'lift': [[_ratio(both[i][j] * total, counts[i] * counts[j]) for j in range(len(names))]
+                     for i in range(len(names))],
+            'phi': [[_phi(both[i][j], counts[i], counts[j], total) for j in range(len(names))]
+                    for i in range(len(names))]
+        },
+        'lagged': {}
+    }
+
+    for lag in lags:
+        # Bit i of a shifted set is day i - lag of the original
+        pairs = (logged << lag) & logged
+        leading = [(bits << lag) & pairs for bits in series]
+        trailing = [bits & pairs for bits in series]
+        pair_total = pairs.bit_count()
+        leading_counts = [bits.bit_count() for bits in leading]
+        trailing_counts = [bits.bit_count() for bits in trailing]
+        lagged = [[(a & b).bit_count() for b in trailing] for a in leading]
+        result['lagged'][lag] = {
+            'pairs': pair_total,
+            'counts': lagged,
+            'lift': [[_ratio(lagged[i][j] * pair_total, leading_counts[i] * trailing_counts[j])
+                      for j in range(len(names))] for i in range(len(names))]
+        }
+
+    cycle_days = {cycle_day: bits & mask for cycle_day, bits in bitsets.cycle_days.items()}
+    cycle_days = {cycle_day: bits for cycle_day, bits in cycle_days.items() if bits}
+    cycle_totals = [bits.bit_count() for bits in cycle_days.values()]
+    cycle_counts = [[(a & bits).bit_count() for bits in cycle_days.values()] for a in series]
+    result['cycle_days'] = {
+        'cycle_days': list(cycle_days),
+        'days': cycle_totals,
+        'counts': cycle_counts,
+        # Rate on that cycle day relative to the symptom's overall rate
+        'lift': [[_ratio(cycle_counts[i][j] * total, cycle_totals[j] * counts[i]) for j in range(len(cycle_totals))]
+                 for i in range(len(names))]
+    }
+    return result
+
+
+class CorrelationEngine:
+    """Correlations for a store, cached on its data version
+
+    The bitsets are rebuilt when store.version changes; query results are
+    kept for the current version in a small LRU. Callers hold the store's
+    reading() lock, which also serializes access to the caches.
+    """
+
+    def __init__(self, store, vocabulary=None):
+        self.store = store
+        self.vocabulary = vocabulary
+        self._version = None
+        self._bitsets = None
+        self._results = OrderedDict()
+
+        # Counters for monitoring
+        self.builds = 0
+        self.hits = 0
+
+    def bitsets(self, data):
+        """Return the bitsets of the store's current data version"""
+        if self._version != self.store.version:
+            self._bitsets = SymptomBitsets(data, self.vocabulary)
+            self._version = self.store.version
+            self._results.clear()
+            self.builds += 1
+        return self._bitsets
+
+    def query(self, data, start=None, end=None, lags=(1,), by='symptom'):
+        """Return compute_correlations() for the current data, from the cache when possible"""
+        bitsets = self.bitsets(data)
+        key = (start, end, tuple(lags), by)
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result
+        result = self._results[key] = compute_correlations(bitsets, start, end, lags, by)
+        if len(self._results) > RESULT_CACHE_SIZE:
+            self._results.popitem(last=False)
+        return result
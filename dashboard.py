@@ -3,13 +3,22 @@
 """
 Dashboard module for Symptom Tracker
 Contains all functions related to data analysis and dashboard functionality
+
+All analytics are produced by compute_analytics(), which walks the history
+once; the individual functions below delegate to it.
 """
 
 import json
-from datetime import datetime, timedelta
+from bisect import bisect_left, bisect_right, insort
+from datetime import date as date_type, datetime, timedelta
 from collections import Counter, defaultdict
 import os
 
+from symptom_store import iter_symptom_file
+from symptom_vocab import SymptomVocabulary, split_symptom
+
+ANALYTICS_PARTS = ('stats', 'timeline', 'cycle_analysis', 'trends')
+
 def load_symptoms_data(symptom_file):
     """Load symptoms from JSON file"""
     try:
@@ -18,212 +27,506 @@ def load_symptoms_data(symptom_file):
     except (FileNotFoundError, json.JSONDecodeError):
         return {}
 
-def get_dashboard_stats(data):
-    """Calculate dashboard statistics from symptom data"""
-    if not data:
-        return {
-            'total_entries': 0,
-            'date_range': {'start': None, 'end': None},
-            'symptom_frequency': {},
-            'cycle_day_patterns': {},
-            'recent_entries': [],
-            'monthly_summary': {},
-            'timeline_data': {'dates': [], 'symptoms': [], 'data': {}}
-        }
-    
-    # Basic stats
-    total_entries = len(data)
-    dates = sorted(data.keys())
-    date_range = {
-        'start': dates[0] if dates else None,
-        'end': dates[-1] if dates else None
-    }
-    
-    # Symptom frequency analysis
-    all_symptoms = []
-    cycle_days = []
-    recent_entries = []
-    
-    for date, entries in data.items():
-        if entries:  # entries is a list
-            latest_entry = entries[-1]  # Get the latest entry for that date
-            symptoms = latest_entry.get('symptoms', [])
-            cycle_day = latest_entry.get('cycleDay')
-            comment = latest_entry.get('comment', '')
-            datetime_str = latest_entry.get('datetime', date)
-            
-            # Process symptoms for frequency
-            for symptom in symptoms:
-                all_symptoms.append(symptom)
-            
-            # Track cycle days
-            if cycle_day is not None:
-                cycle_days.append(cycle_day)
-            
-            # Recent entries (last 7 days)
-            try:
-                entry_date = datetime.strptime(date, '%Y-%m-%d')
-                if (datetime.now() - entry_date).days <= 7:
-                    recent_entries.append({
-                        'date': date,
-                        'symptoms': symptoms,
-                        'cycle_day': cycle_day,
-                        'comment': comment,
-                        'datetime': datetime_str
-                    })
-            except ValueError:
-                pass
-    
-    # Calculate symptom frequency
-    symptom_counter = Counter(all_symptoms)
-    symptom_frequency = dict(symptom_counter.most_common())
-    
-    # Cycle day patterns
-    cycle_day_patterns = {}
-    if cycle_days:
-        cycle_counter = Counter(cycle_days)
-        cycle_day_patterns = {
-            'most_common': cycle_counter.most_common(5),
-            'average': sum(cycle_days) / len(cycle_days),
-            'range': {'min': min(cycle_days), 'max': max(cycle_days)}
-        }
-    
-    # Monthly summary
-    monthly_data = defaultdict(lambda: {'entries': 0, 'symptoms': []})
-    for date in dates:
+def iter_symptoms_data(symptom_file):
+    """Stream (date, entries) pairs from a JSON file one date at a time
+
+    Can be passed to compute_analytics() and get_dashboard_stats() instead
+    of the loaded dict to keep memory flat for very large logs.
+    """
+    return iter_symptom_file(symptom_file)
+
+def most_common(counter, n=None):
+    """Counter.most_common with ties broken by key so results are deterministic"""
+    items = sorted(counter.items(), key=lambda item: (-item[1], str(item[0])))
+    return items if n is None else items[:n]
+
+def date_ordinal(date):
+    """Return the proleptic ordinal of a 'YYYY-MM-DD' key, or None if it is not a valid date"""
+    if len(date) == 10 and date[4] == '-' and date[7] == '-':
         try:
-            date_obj = datetime.strptime(date, '%Y-%m-%d')
-            month_key = date_obj.strftime('%Y-%m')
-            monthly_data[month_key]['entries'] += 1
-            
-            # Add symptoms for this month
-            if data[date]:
-                latest_entry = data[date][-1]
-                symptoms = latest_entry.get('symptoms', [])
-                monthly_data[month_key]['symptoms'].extend(symptoms)
+            return date_type.fromisoformat(date).toordinal()
         except ValueError:
+            pass
+    # Slow path for keys strptime accepts but fromisoformat does not (e.g. '2024-1-5')
+    try:
+        return datetime.strptime(date, '%Y-%m-%d').toordinal()
+    except (ValueError, TypeError):
+        return None
+
+def counted_cycle_day(value):
+    """Return a cycleDay if it can be counted (an int), else None
+
+    Logs written before cycleDay was validated may hold other values; like
+    the window stats and correlations, the analytics skip them.
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
+
+def compute_analytics(data, trend_symptoms=(), include=ANALYTICS_PARTS, vocabulary=None):
+    """Compute all dashboard analytics in a single pass over the history
+
+    Returns a dict with the parts listed in include:
+    - 'stats': get_dashboard_stats() result
+    - 'timeline': generate_timeline_data() result
+    - 'cycle_analysis': get_cycle_analysis() result
+    - 'trends': {symptom_name: get_symptom_trends() result} for trend_symptoms
+
+    Each date is parsed once. Symptom strings are resolved to symptom_vocab
+    records, so splitting and lowercasing happen once per distinct string
+    (for the life of the vocabulary when a shard's is passed in), and each
+    record is matched against the trend queries once per call.
+
+    data may also be an iterable of (date, entries) pairs in any order, such
+    as iter_symptoms_data(), so the log never has to be loaded as a whole.
+    """
+    presorted = isinstance(data, dict)
+    if presorted:
+        pairs = ((date, data[date]) for date in sorted(data))
+    else:
+        pairs = data
+
+    want_stats = 'stats' in include
+    want_timeline = 'timeline' in include or want_stats
+    want_cycles = 'cycle_analysis' in include
+    trend_queries = [(name, name.lower()) for name in trend_symptoms] if 'trends' in include else []
+
+    today_ordinal = datetime.now().toordinal()
+
+    symptom_counter = Counter()
+    cycle_day_counter = Counter()
+    cycle_day_sum = 0
+    recent_entries = []
+    monthly_counters = {}
+    monthly_entries = Counter()
+    timeline_base_ids = set()
+    timeline_entries = {}
+    timeline_cycle_days = {}
+    cycle_symptom_map = defaultdict(Counter)
+    trends = {name: [] for name, _ in trend_queries}
+
+    if vocabulary is None:
+        vocabulary = SymptomVocabulary()
+    record_of = vocabulary.record
+    bases = vocabulary.bases
+    type_payloads = vocabulary.type_payloads
+    # Per query: record id -> whether the record matches
+    match_caches = {name: {} for name, _ in trend_queries}
+
+    dates = []
+    for date, entries in pairs:
+        if want_timeline:
+            dates.append(date)
+        ordinal = date_ordinal(date)
+
+        month_key = None
+        if ordinal is not None and want_stats:
+            date_obj = date_type.fromordinal(ordinal)
+            month_key = f"{date_obj.year:04d}-{date_obj.month:02d}"
+            monthly_entries[month_key] += 1
+
+        if not entries:
             continue
-    
-    # Process monthly symptoms
-    monthly_summary = {}
-    for month, month_data in monthly_data.items():
-        symptom_count = Counter(month_data['symptoms'])
-        monthly_summary[month] = {
-            'entries': month_data['entries'],
-            'total_symptoms': len(month_data['symptoms']),
-            'unique_symptoms': len(symptom_count),
-            'top_symptoms': symptom_count.most_common(3)
-        }
-    
-    # Sort recent entries by date (newest first)
-    recent_entries.sort(key=lambda x: x['date'], reverse=True)
-    
-    # Generate timeline data for chart
-    timeline_data = generate_timeline_data(data)
-    
-    return {
-        'total_entries': total_entries,
-        'date_range': date_range,
-        'symptom_frequency': symptom_frequency,
-        'cycle_day_patterns': cycle_day_patterns,
-        'recent_entries': recent_entries[:7],  # Limit to 7 most recent
-        'monthly_summary': dict(sorted(monthly_summary.items(), reverse=True)),
-        'timeline_data': timeline_data
-    }
 
-def get_symptom_trends(data, symptom_name):
-    """Get trend data for a specific symptom over time"""
-    trend_data = []
-    
-    for date, entries in sorted(data.items()):
-        if entries:
-            latest_entry = entries[-1]
-            symptoms = latest_entry.get('symptoms', [])
-            cycle_day = latest_entry.get('cycleDay')
-            
-            # Check if symptom occurred
-            occurred = any(symptom_name.lower() in symptom.lower() for symptom in symptoms)
-            
-            trend_data.append({
+        latest_entry = entries[-1]
+        symptoms = latest_entry.get('symptoms', [])
+        cycle_day = latest_entry.get('cycleDay')
+        counted_day = counted_cycle_day(cycle_day)
+
+        if want_stats:
+            symptom_counter.update(symptoms)
+            if counted_day is not None:
+                cycle_day_counter[counted_day] += 1
+                cycle_day_sum += counted_day
+            if month_key is not None:
+                month_counter = monthly_counters.get(month_key)
+                if month_counter is None:
+                    month_counter = monthly_counters[month_key] = Counter()
+                month_counter.update(symptoms)
+            if ordinal is not None and today_ordinal - ordinal <= 7:
+                recent_entries.append({
+                    'date': date,
+                    'symptoms': symptoms,
+                    'cycle_day': cycle_day,
+                    'comment': latest_entry.get('comment', ''),
+                    'datetime': latest_entry.get('datetime', date)
+                })
+
+        if want_timeline or trend_queries:
+            records = [record_of(symptom) for symptom in symptoms]
+
+        if want_timeline:
+            if counted_day is not None:
+                timeline_cycle_days[date] = counted_day
+            processed_symptoms = {}
+            for record in records:
+                timeline_base_ids.add(record.base_id)
+                processed_symptoms[bases[record.base_id]] = type_payloads[record.type_id]
+            timeline_entries[date] = processed_symptoms
+
+        if want_cycles and counted_day is not None:
+            cycle_symptom_map[counted_day].update(symptoms)
+
+        for name, needle in trend_queries:
+            match_cache = match_caches[name]
+            occurred = False
+            for record in records:
+                matched = match_cache.get(record.id)
+                if matched is None:
+                    matched = match_cache[record.id] = vocabulary.matches(record, needle)
+                if matched:
+                    occurred = True
+                    break
+            trends[name].append({
                 'date': date,
                 'occurred': occurred,
                 'cycle_day': cycle_day,
                 'all_symptoms': symptoms
             })
-    
-    return trend_data
 
-def generate_timeline_data(data):
-    """Generate timeline data for the chart visualization"""
+    if not presorted:
+        dates.sort()
+        for trend_data in trends.values():
+            trend_data.sort(key=lambda item: item['date'])
+        recent_entries.sort(key=lambda item: item['date'])
+
+    results = {}
+
+    if want_timeline:
+        timeline = {
+            'dates': dates,
+            'symptoms': sorted(bases[base_id] for base_id in timeline_base_ids),
+            'data': timeline_entries,
+            'cycle_days': timeline_cycle_days
+        }
+        if 'timeline' in include:
+            results['timeline'] = timeline
+
+    if want_stats:
+        cycle_day_patterns = {}
+        if cycle_day_counter:
+            cycle_day_total = sum(cycle_day_counter.values())
+            cycle_day_patterns = {
+                'most_common': most_common(cycle_day_counter, 5),
+                'average': cycle_day_sum / cycle_day_total,
+                'range': {'min': min(cycle_day_counter), 'max': max(cycle_day_counter)}
+            }
+
+        monthly_summary = {}
+        for month in sorted(monthly_entries, reverse=True):
+            month_counter = monthly_counters.get(month, Counter())
+            monthly_summary[month] = {
+                'entries': monthly_entries[month],
+                'total_symptoms': sum(month_counter.values()),
+                'unique_symptoms': len(month_counter),
+                'top_symptoms': most_common(month_counter, 3)
+            }
+
+        # Dates were visited oldest first
+        recent_entries.reverse()
+
+        results['stats'] = {
+            'total_entries': len(dates),
+            'date_range': {
+                'start': dates[0] if dates else None,
+                'end': dates[-1] if dates else None
+            },
+            'symptom_frequency': dict(most_common(symptom_counter)),
+            'cycle_day_patterns': cycle_day_patterns,
+            'recent_entries': recent_entries[:7],  # Limit to 7 most recent
+            'monthly_summary': monthly_summary,
+            'timeline_data': timeline
+        }
+
+    if want_cycles:
+        cycle_analysis = {}
+        for cycle_day in sorted(cycle_symptom_map):
+            counter = cycle_symptom_map[cycle_day]
+            cycle_analysis[cycle_day] = {
+                'total_occurrences': sum(counter.values()),
+                'symptom_frequency': dict(counter),
+                'most_common_symptom': most_common(counter, 1)[0] if counter else None
+            }
+        results['cycle_analysis'] = cycle_analysis
+
+    if trend_queries:
+        results['trends'] = trends
+
+    return results
+
+def get_dashboard_stats(data, aggregates=None):
+    """Calculate dashboard statistics from symptom data
+
+    When a DashboardAggregates kept in sync with data is given, the stats are
+    read from it instead of walking the whole history.
+    """
+    if aggregates is not None:
+        return aggregates.to_stats(data)
+
+    empty_stats = {
+        'total_entries': 0,
+        'date_range': {'start': None, 'end': None},
+        'symptom_frequency': {},
+        'cycle_day_patterns': {},
+        'recent_entries': [],
+        'monthly_summary': {},
+        'timeline_data': {'dates': [], 'symptoms': [], 'data': {}}
+    }
     if not data:
-        return {'dates': [], 'symptoms': [], 'data': {}, 'cycle_days': {}}
-    
-    # Get all dates and sort them
-    dates = sorted(data.keys())
-    
-    # Get all unique symptoms across all dates
-    all_symptoms = set()
-    timeline_entries = {}
-    cycle_days = {}
-    
-    for date, entries in data.items():
-        if entries:
-            latest_entry = entries[-1]
-            symptoms = latest_entry.get('symptoms', [])
-            cycle_day = latest_entry.get('cycleDay')
-            
-            # Store cycle day if available
-            if cycle_day is not None:
-                cycle_days[date] = cycle_day
-            
-            # Process symptoms and extract types for dropdowns
-            processed_symptoms = {}
-            for symptom in symptoms:
-                # Handle dropdown symptoms with types
-                if ':' in symptom:
-                    base_symptom, symptom_type = symptom.split(':', 1)
-                    base_symptom = base_symptom.strip()
-                    symptom_type = symptom_type.strip()
-                    all_symptoms.add(base_symptom)
-                    processed_symptoms[base_symptom] = {'type': symptom_type}
-                else:
-                    # Regular symptoms or dropdown without selection
-                    all_symptoms.add(symptom)
-                    processed_symptoms[symptom] = {'type': 'general'}
-            
-            timeline_entries[date] = processed_symptoms
-    
-    # Convert to sorted lists for consistent ordering
-    symptoms_list = sorted(list(all_symptoms))
-    
+        return empty_stats
+
+    stats = compute_analytics(data, include=('stats',))['stats']
+    # data may be a stream that turned out to be empty
+    return stats if stats['total_entries'] else empty_stats
+
+def get_symptom_trends(data, symptom_name):
+    """Get trend data for a specific symptom over time"""
+    return compute_analytics(data, trend_symptoms=(symptom_name,), include=('trends',))['trends'][symptom_name]
+
+def generate_timeline_data(data, compact=False, start=None, end=None):
+    """Generate timeline data for the chart visualization
+
+    With compact=True the result is run-length encoded (see
+    encode_timeline) and limited to dates in [start, end].
+    """
+    if not data:
+        timeline = {'dates': [], 'symptoms': [], 'data': {}, 'cycle_days': {}}
+    else:
+        timeline = compute_analytics(data, include=('timeline',))['timeline']
+
+    if compact:
+        return encode_timeline(timeline, start, end)
+    return timeline
+
+def encode_timeline(timeline, start=None, end=None):
+    """Encode a timeline in a compact, windowed form for the dashboard chart
+
+    Returns:
+    - dates: sorted dates in [start, end]
+    - cycle_days: cycle day per date (None when not logged)
+    - symptoms / types: vocabularies of the symptoms and types in the window
+    - runs: per symptom, [first_date_index, length, type_index] runs of
+      consecutive dates with the same type
+    Each symptom costs a few integers per run instead of a dict per date.
+    """
+    dates = timeline['dates']
+    lo = bisect_left(dates, start) if start else 0
+    hi = bisect_right(dates, end) if end else len(dates)
+    window = dates[lo:hi]
+    day_data = timeline['data']
+    cycle_days = timeline['cycle_days']
+
+    symptom_index = {}
+    type_index = {}
+    runs = []
+    open_runs = {}  # symptom id -> run currently being extended
+
+    for position, date in enumerate(window):
+        for symptom, details in day_data.get(date, {}).items():
+            symptom_id = symptom_index.get(symptom)
+            if symptom_id is None:
+                symptom_id = symptom_index[symptom] = len(runs)
+                runs.append([])
+            type_id = type_index.get(details['type'])
+            if type_id is None:
+                type_id = type_index[details['type']] = len(type_index)
+
+            run = open_runs.get(symptom_id)
+            if run is not None and run[0] + run[1] == position and run[2] == type_id:
+                run[1] += 1
+            else:
+                run = open_runs[symptom_id] = [position, 1, type_id]
+                runs[symptom_id].append(run)
+
+    # Present symptoms alphabetically like the verbose timeline
+    symptoms = list(symptom_index)
+    order = sorted(range(len(symptoms)), key=symptoms.__getitem__)
     return {
-        'dates': dates,
-        'symptoms': symptoms_list,
-        'data': timeline_entries,
-        'cycle_days': cycle_days
+        'dates': window,
+        'cycle_days': [cycle_days.get(date) for date in window],
+        'symptoms': [symptoms[symptom_id] for symptom_id in order],
+        'types': list(type_index),
+        'runs': [runs[symptom_id] for symptom_id in order]
     }
 
 def get_cycle_analysis(data):
     """Analyze patterns based on cycle days"""
-    cycle_symptom_map = defaultdict(list)
-    
-    for date, entries in data.items():
-        if entries:
+    return compute_analytics(data, include=('cycle_analysis',))['cycle_analysis']
+
+
+def _add_count(counter, key, amount):
+    """Add to a Counter and drop the key once it reaches zero"""
+    value = counter[key] + amount
+    if value:
+        counter[key] = value
+    else:
+        del counter[key]
+
+
+class DashboardAggregates:
+    """Materialized dashboard statistics maintained incrementally on write
+
+    Register it as a store view: rebuild(data) recomputes everything after
+    a reload, apply(date, old_entries, new_entries) removes the old entry's
+    contribution and adds the new one, so a single save costs O(symptoms
+    per entry) and the dashboard no longer walks the whole history.
+    """
+
+    def __init__(self, vocabulary=None):
+        self.vocabulary = SymptomVocabulary() if vocabulary is None else vocabulary
+        self.rebuild({})
+
+    def rebuild(self, data):
+        """Recompute all aggregates from scratch"""
+        self.dates = []
+        self.symptom_counts = Counter()
+        self.cycle_day_counts = Counter()
+        self.cycle_day_sum = 0
+        self.cycle_day_total = 0
+        self.months = {}
+        self.timeline_entries = {}
+        self.timeline_symptoms = Counter()
+        self.timeline_cycle_days = {}
+
+        for date, entries in data.items():
+            self._contribute(date, entries, 1)
+
+    def apply(self, date, old_entries, new_entries):
+        """Replace the contribution of one date"""
+        if old_entries is not None:
+            self._contribute(date, old_entries, -1)
+        if new_entries is not None:
+            self._contribute(date, new_entries, 1)
+
+    def _contribute(self, date, entries, sign):
+        """Add (sign=1) or remove (sign=-1) the contribution of one date"""
+        if sign > 0:
+            insort(self.dates, date)
+        else:
+            del self.dates[bisect_left(self.dates, date)]
+
+        ordinal = date_ordinal(date)
+        month = None
+        if ordinal is not None:
+            date_obj = date_type.fromordinal(ordinal)
+            month_key = f"{date_obj.year:04d}-{date_obj.month:02d}"
+            month = self.months.setdefault(month_key, {'entries': 0, 'symptoms': Counter(), 'total_symptoms': 0})
+            month['entries'] += sign
+            if month['entries'] == 0:
+                del self.months[month_key]
+
+        if not entries:
+            return
+
+        latest_entry = entries[-1]
+        symptoms = latest_entry.get('symptoms', [])
+        cycle_day = counted_cycle_day(latest_entry.get('cycleDay'))
+
+        for symptom in symptoms:
+            _add_count(self.symptom_counts, symptom, sign)
+            if month is not None:
+                _add_count(month['symptoms'], symptom, sign)
+        if month is not None:
+            month['total_symptoms'] += sign * len(symptoms)
+
+        if cycle_day is not None:
+            _add_count(self.cycle_day_counts, cycle_day, sign)
+            self.cycle_day_sum += sign * cycle_day
+            self.cycle_day_total += sign
+            if sign > 0:
+                self.timeline_cycle_days[date] = cycle_day
+            else:
+                self.timeline_cycle_days.pop(date, None)
+
+        vocabulary = self.vocabulary
+        processed_symptoms = {}
+        for symptom in symptoms:
+            record = vocabulary.record(symptom)
+            processed_symptoms[vocabulary.bases[record.base_id]] = vocabulary.type_payloads[record.type_id]
+        for symptom in processed_symptoms:
+            _add_count(self.timeline_symptoms, symptom, sign)
+        if sign > 0:
+            self.timeline_entries[date] = processed_symptoms
+        else:
+            self.timeline_entries.pop(date, None)
+
+    def _recent_entries(self, data):
+        """Return up to 7 entries from the last 7 days, newest first"""
+        today_ordinal = datetime.now().toordinal()
+        recent_entries = []
+        for date in reversed(self.dates):
+            ordinal = date_ordinal(date)
+            if ordinal is None:
+                continue
+            if today_ordinal - ordinal > 7:
+                break
+            entries = data.get(date)
+            if not entries:
+                continue
             latest_entry = entries[-1]
-            cycle_day = latest_entry.get('cycleDay')
-            symptoms = latest_entry.get('symptoms', [])
-            
-            if cycle_day is not None:
-                cycle_symptom_map[cycle_day].extend(symptoms)
-    
-    # Calculate symptom frequency per cycle day
-    cycle_analysis = {}
-    for cycle_day, symptoms in cycle_symptom_map.items():
-        symptom_counter = Counter(symptoms)
-        cycle_analysis[cycle_day] = {
-            'total_occurrences': len(symptoms),
-            'symptom_frequency': dict(symptom_counter),
-            'most_common_symptom': symptom_counter.most_common(1)[0] if symptom_counter else None
+            recent_entries.append({
+                'date': date,
+                'symptoms': latest_entry.get('symptoms', []),
+                'cycle_day': latest_entry.get('cycleDay'),
+                'comment': latest_entry.get('comment', ''),
+                'datetime': latest_entry.get('datetime', date)
+            })
+            if len(recent_entries) == 7:
+                break
+        return recent_entries
+
+    def to_stats(self, data):
+        """Return the same structure as get_dashboard_stats"""
+        if not self.dates:
+            return get_dashboard_stats({})
+
+        cycle_day_patterns = {}
+        if self.cycle_day_total:
+            cycle_day_patterns = {
+                'most_common': most_common(self.cycle_day_counts, 5),
+                'average': self.cycle_day_sum / self.cycle_day_total,
+                'range': {'min': min(self.cycle_day_counts), 'max': max(self.cycle_day_counts)}
+            }
+
+        monthly_summary = {}
+        for month in sorted(self.months, reverse=True):
+            month_data = self.months[month]
+            monthly_summary[month] = {
+                'entries': month_data['entries'],
+                'total_symptoms': month_data['total_symptoms'],
+                'unique_symptoms': len(month_data['symptoms']),
+                'top_symptoms': most_common(month_data['symptoms'], 3)
+            }
+
+        return {
+            'total_entries': len(self.dates),
+            'date_range': {'start': self.dates[0], 'end': self.dates[-1]},
+            'symptom_frequency': dict(most_common(self.symptom_counts)),
+            'cycle_day_patterns': cycle_day_patterns,
+            'recent_entries': self._recent_entries(data),
+            'monthly_summary': monthly_summary,
+            'timeline_data': self.timeline_data()
+        }
+
+    def timeline_data(self):
+        """Return the same structure as generate_timeline_data"""
+        return {
+            'dates': list(self.dates),
+            'symptoms': sorted(self.timeline_symptoms),
+            'data': self.timeline_entries,
+            'cycle_days': self.timeline_cycle_days
         }
-    
-    return dict(sorted(cycle_analysis.items()))
\ No newline at end of file
+
+    def verify(self, data):
+        """Compare against a full recompute and return the keys that differ"""
+        expected = get_dashboard_stats(data)
+        actual = self.to_stats(data)
+        mismatches = []
+        for key, value in expected.items():
+            if key in ('symptom_frequency', 'monthly_summary'):
+                # Compare as ordered item lists, the order is part of the output
+                if list(value.items()) != list(actual[key].items()):
+                    mismatches.append(key)
+            elif value != actual[key]:
+                mismatches.append(key)
+        return mismatches
@@ -12,6 +12,18 @@ For PythonAnywhere deployment:
 
 import sys
 import os
+import cProfile
+import functools
+import gzip
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Start of the cold-start measurement exported at /metrics
+IMPORT_STARTED = time.perf_counter()
 
 # Add your project directory to Python path
 # Detect if running locally or on PythonAnywhere
@@ -22,10 +34,24 @@ else:  # Linux/PythonAnywhere
     if BASE_DIR not in sys.path:
         sys.path.append(BASE_DIR)
 
-from flask import Flask, render_template, request, jsonify
-import json
-from datetime import datetime
-from dashboard import get_dashboard_stats
+from flask import Flask, render_template, request, jsonify, g, abort, has_request_context, stream_with_context
+from datetime import datetime, timezone
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.security import check_password_hash
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+try:
+    import pyinstrument
+except ImportError:  # pyinstrument is optional, cProfile is always available
+    pyinstrument = None
+from symptom_vocab import normalize_symptoms
+from symptom_index import MATCH_MODES
+from shards import Shard, ShardPool
+import bulk_io
+import metrics
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -40,68 +66,330 @@ def strptime_filter(date_string, format):
         return datetime.now()
 
 # Set up paths
-DATA_DIR = os.path.join(BASE_DIR, 'data')
+DATA_DIR = os.environ.get('SYMPTOM_DATA_DIR', os.path.join(BASE_DIR, 'data'))
 SYMPTOM_FILE = os.path.join(DATA_DIR, 'symptom_log.json')
+# Generated files (compiled templates, profiles) live outside DATA_DIR and are git-ignored
+CACHE_DIR = os.environ.get('SYMPTOM_CACHE_DIR', os.path.join(BASE_DIR, 'cache'))
+
+# Length used to predict today's cycle day (matches the cycle day slider in index.html)
+CYCLE_LENGTH = int(os.environ.get('SYMPTOM_CYCLE_LENGTH', '28'))
+
+# Largest rolling series /api/analytics/rolling returns per window (ten years of days)
+MAX_ROLLING_POINTS = 3660
+
+# Largest day offset of the lagged matrices at /api/correlations
+MAX_CORRELATION_LAG = 90
+
+# Per-request profiling is enabled by setting a token; requests sending it in
+# an X-Profile header or ?profile= query flag are profiled into PROFILE_DIR
+PROFILE_TOKEN = os.environ.get('SYMPTOM_PROFILE_TOKEN')
+PROFILE_DIR = os.path.join(CACHE_DIR, 'profiles')
+
+# Storage backend: 'json' rewrites the whole file on save, 'journal' appends one
+# line per save, 'sqlite' stores entries in an indexed database
+STORAGE_BACKEND = os.environ.get('SYMPTOM_STORAGE', 'json')
 
 # Ensure data directory exists
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
 
+# Compiled templates are cached on disk so fresh workers skip the Jinja compile step
+TEMPLATE_CACHE_DIR = os.environ.get('SYMPTOM_TEMPLATE_CACHE_DIR', os.path.join(CACHE_DIR, 'template_cache'))
+os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+
+# Optional warm-up of each worker before its first request (see warm_up)
+WARM_UP = os.environ.get('SYMPTOM_WARM_UP', '') in ('1', 'true', 'yes')
+
+# Write-behind mode (SYMPTOM_WRITE_BEHIND=1, json and journal storage): a save
+# returns once it is fsynced to a small per-process journal, and the store is
+# written in the background at most SYMPTOM_WRITE_MAX_LATENCY seconds later
+WRITE_BEHIND = os.environ.get('SYMPTOM_WRITE_BEHIND', '') in ('1', 'true', 'yes')
+WRITE_MAX_LATENCY = float(os.environ.get('SYMPTOM_WRITE_MAX_LATENCY', '1.0'))
+WRITE_BEHIND_LATENCY = WRITE_MAX_LATENCY if WRITE_BEHIND else None
+
+# Single-user data set in DATA_DIR: the cached store, its symptom index and
+# the background stats worker (dashboard aggregates are created on first use)
+default_shard = Shard(DATA_DIR, STORAGE_BACKEND, WRITE_BEHIND_LATENCY)
+store = default_shard.store
+symptom_index = default_shard.symptom_index
+stats_worker = default_shard.stats_worker
+
+# Multi-user mode: every authenticated user gets their own shard under
+# DATA_DIR/users/, at most MAX_OPEN_SHARDS stay open. Users are authenticated
+# either by the web server (REMOTE_USER in the WSGI environ) or with HTTP Basic
+# auth checked against SYMPTOM_USERS_FILE, a JSON object of user name ->
+# werkzeug password hash, e.g. from
+#     python -c "from werkzeug.security import generate_password_hash as h; print(h('secret'))"
+# Keep the users file out of the synced project directory.
+MULTI_USER = os.environ.get('SYMPTOM_MULTI_USER', '') in ('1', 'true', 'yes')
+MAX_OPEN_SHARDS = int(os.environ.get('SYMPTOM_MAX_OPEN_SHARDS', '64'))
+USERS_FILE = os.environ.get('SYMPTOM_USERS_FILE')
+shard_pool = ShardPool(DATA_DIR, STORAGE_BACKEND, MAX_OPEN_SHARDS, WRITE_BEHIND_LATENCY) if MULTI_USER else None
+
+def load_password_hashes():
+    """Return {user name: password hash} from USERS_FILE (empty if not configured)"""
+    if not USERS_FILE:
+        return {}
+    with open(USERS_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+PASSWORD_HASHES = load_password_hashes() if MULTI_USER else {}
+
+# Successful password checks, so the slow hash runs once per login instead of
+# once per request. Keyed on an HMAC of the credentials with a per-process
+# key, so no passwords are kept in memory; includes the stored hash, so a
+# changed password stops matching.
+VERIFIED_CREDENTIALS_MAX = 256
+_verified_credentials = OrderedDict()
+_verified_credentials_lock = threading.Lock()
+_CREDENTIALS_KEY = os.urandom(32)
+
+def check_credentials(username, password):
+    """Return whether password matches the USERS_FILE hash of username"""
+    password_hash = PASSWORD_HASHES.get(username)
+    if password_hash is None:
+        return False
+    key = hmac.new(_CREDENTIALS_KEY, '\0'.join((username, password, password_hash)).encode('utf-8'),
+                   hashlib.sha256).digest()
+    with _verified_credentials_lock:
+        if key in _verified_credentials:
+            _verified_credentials.move_to_end(key)
+            return True
+    if not check_password_hash(password_hash, password):
+        return False
+    with _verified_credentials_lock:
+        _verified_credentials[key] = True
+        while len(_verified_credentials) > VERIFIED_CREDENTIALS_MAX:
+            _verified_credentials.popitem(last=False)
+    return True
+
+def request_user():
+    """Return the authenticated user of the current request, or None
+
+    Only identities that were verified count: REMOTE_USER set by the web
+    server, or Basic auth credentials whose password matches USERS_FILE.
+    """
+    remote_user = request.environ.get('REMOTE_USER')
+    if remote_user:
+        return remote_user
+    auth = request.authorization
+    if auth is None or auth.type != 'basic' or not auth.username:
+        return None
+    if not check_credentials(auth.username, auth.password or ''):
+        return None
+    return auth.username
+
+def current_shard():
+    """Return the shard serving the current request (the default one in single-user mode)"""
+    if shard_pool is None or not has_request_context():
+        return default_shard
+    shard = g.get('shard')
+    if shard is None:
+        user = request_user()
+        if user is None:
+            response = jsonify({"success": False, "message": "Authentication required"})
+            response.status_code = 401
+            response.headers['WWW-Authenticate'] = 'Basic realm="Symptom Tracker"'
+            abort(response)
+        shard = g.shard = shard_pool.get(user)
+    return shard
+
+def negotiate_encoding():
+    """Return the best response compression the client accepts ('br', 'gzip' or None)"""
+    if brotli is not None and request.accept_encodings['br']:
+        return 'br'
+    if request.accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+def compressed_json(payload):
+    """Return a compact JSON response, compressed when the client supports it"""
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    encoding = negotiate_encoding()
+    if encoding == 'br':
+        body = brotli.compress(body)
+    elif encoding == 'gzip':
+        body = gzip.compress(body, compresslevel=6)
+
+    response = app.response_class(body, mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+def conditional(view=None, vary_encoding=False):
+    """Answer conditional GETs with 304 when the symptom data has not changed
+
+    The ETag combines the store's data version (derived from the data files'
+    stat, so all workers agree) with today's date, because the default date
+    and the dashboard's 7-day window depend on it. A 304 is returned before
+    the data is loaded or any stats are computed. Views that compress their
+    response with compressed_json() pass vary_encoding=True so each encoding
+    gets its own ETag.
+    """
+    if view is None:
+        return functools.partial(conditional, vary_encoding=vary_encoding)
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        data_etag, data_mtime = current_shard().store.validators()
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        etag = f"{data_etag}-{today.strftime('%Y%m%d')}"
+        if vary_encoding:
+            etag += f"-{negotiate_encoding() or 'identity'}"
+        last_modified = datetime.fromtimestamp(int(max(data_mtime, today.timestamp())), timezone.utc)
+
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains(etag)
+        else:
+            # Last-Modified has 1s resolution, only trust it once that second has passed
+            not_modified = (request.if_modified_since is not None
+                            and request.if_modified_since >= last_modified
+                            and time.time() - data_mtime >= 1)
+
+        if not_modified:
+            response = app.response_class(status=304)
+            if vary_encoding:
+                response.vary.add('Accept-Encoding')
+        else:
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        # Views serving an older snapshot set its ETag themselves
+        if not response.get_etag()[0]:
+            response.set_etag(etag)
+        response.last_modified = last_modified
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+    return wrapper
+
+def render_page(template, **context):
+    """render_template with the render time recorded for /metrics"""
+    with metrics.TEMPLATE_DURATION.time(template=template):
+        return render_template(template, **context)
+
+def start_profiler():
+    """Start profiling the current request (pyinstrument if asked for and installed)"""
+    engine = request.headers.get('X-Profile-Engine') or request.args.get('profile_engine')
+    if engine == 'pyinstrument' and pyinstrument is not None:
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    return profiler
+
+def stop_profiler(profiler):
+    """Stop a request profiler, write its dump to PROFILE_DIR and return the file name"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{request.endpoint or 'unmatched'}"
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        name += '.prof'
+        profiler.dump_stats(os.path.join(PROFILE_DIR, name))
+    else:
+        profiler.stop()
+        name += '.html'
+        with open(os.path.join(PROFILE_DIR, name), 'w', encoding='utf-8') as f:
+            f.write(profiler.output_html())
+    return name
+
+@app.before_request
+def start_request_timer():
+    """Start timing the request, and profiling it when the profile token is sent"""
+    g.request_started = time.perf_counter()
+    token = request.headers.get('X-Profile') or request.args.get('profile')
+    if PROFILE_TOKEN and token and hmac.compare_digest(token, PROFILE_TOKEN):
+        g.profiler = start_profiler()
+
+@app.after_request
+def record_request(response):
+    """Record the request duration per route and attach the profile file name"""
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        response.headers['X-Profile-File'] = stop_profiler(profiler)
+    started = g.get('request_started')
+    if started is not None:
+        elapsed = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.REQUEST_DURATION.observe(elapsed, route=route, method=request.method, status=response.status_code)
+        record_first_request(elapsed)
+    return response
+
+_first_request_pid = None
+
+def record_first_request(elapsed):
+    """Export the first request of this worker process as part of its cold start"""
+    global _first_request_pid
+    if _first_request_pid != os.getpid():
+        _first_request_pid = os.getpid()
+        metrics.STARTUP_SECONDS.set(elapsed, phase='first_request')
+        metrics.STARTUP_SECONDS.set(STARTUP_IMPORT_SECONDS + elapsed, phase='total')
+
 def load_symptoms():
-    """Load symptoms from JSON file"""
+    """Load symptoms from the cached store (re-reads the file only when it changed)"""
+    return current_shard().store.load()
+
+def log_error(message):
+    """Append a message to error.log for debugging"""
+    error_log_path = os.path.join(BASE_DIR, 'error.log')
     try:
-        with open(SYMPTOM_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+        with open(error_log_path, 'a', encoding='utf-8') as f:
+            f.write(f"{datetime.now()}: {message}\n")
+    except (IOError, OSError):
+        pass  # If we can't write to error log, don't crash
 
 def save_symptoms(data):
     """Save symptoms to JSON file"""
     try:
-        with open(SYMPTOM_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+        shard = current_shard()
+        shard.flush()
+        shard.store.save(data)
+        shard.stats_worker.notify()
     except (IOError, OSError) as e:
-        # Log error for debugging
-        error_log_path = os.path.join(BASE_DIR, 'error.log')
-        try:
-            with open(error_log_path, 'a', encoding='utf-8') as f:
-                f.write(f"{datetime.now()}: Error saving symptoms: {str(e)}\n")
-        except (IOError, OSError):
-            pass  # If we can't write to error log, don't crash
+        log_error(f"Error saving symptoms: {str(e)}")
+        raise
+
+def put_symptoms(date, entries):
+    """Replace the entries for a single date without rewriting unrelated history"""
+    try:
+        current_shard().put(date, entries)
+    except (IOError, OSError) as e:
+        log_error(f"Error saving symptoms: {str(e)}")
         raise
 
 def get_last_cycle_day():
     """Get the last logged cycle day from previous entries"""
-    data = load_symptoms()
-    
-    if not data:
-        return None
-    
-    # Sort dates in descending order to get the most recent entries first
-    sorted_dates = sorted(data.keys(), reverse=True)
-    
-    # Look through entries starting from most recent
-    for date in sorted_dates:
-        entries = data[date]
-        if entries and isinstance(entries, list):
-            # Get the most recent entry for this date (last in list)
-            latest_entry = entries[-1]
-            if 'cycleDay' in latest_entry and latest_entry['cycleDay'] is not None:
-                return latest_entry['cycleDay']
-    
-    return None
+    return current_shard().store.last_cycle_day()
+
+def predict_cycle_day(last_date, last_cycle_day, today=None):
+    """Predict today's cycle day from the last logged one and the days elapsed since
+
+    Returns (predicted_cycle_day, elapsed_days), or (None, None) when the
+    stored values cannot be used for arithmetic.
+    """
+    today = today or datetime.now().date()
+    try:
+        elapsed = (today - datetime.strptime(last_date, '%Y-%m-%d').date()).days
+        predicted = (int(last_cycle_day) - 1 + elapsed) % CYCLE_LENGTH + 1
+    except (ValueError, TypeError):
+        return None, None
+    return predicted, elapsed
 
 @app.route('/')
 def index():
     """Main page"""
-    return render_template('index.html')
+    return render_page('index.html')
 
 @app.route('/api/symptoms', methods=['GET'])
+@conditional
 def get_symptoms():
     """Get symptoms for a specific date"""
     date = request.args.get('date', datetime.now().strftime('%Y-%m-%d'))
-    data = load_symptoms()
-    return jsonify(data.get(date, []))
+    return jsonify(current_shard().store.get(date))
 
 @app.route('/api/symptoms', methods=['POST'])
 def save_symptoms_api():
@@ -109,12 +397,14 @@ def save_symptoms_api():
     try:
         request_data = request.get_json()
         date = request_data.get('date', datetime.now().strftime('%Y-%m-%d'))
-        symptoms = request_data.get('symptoms', [])
-        cycle_day = request_data.get('cycleDay')
+        # Normalize once here so every reader gets the canonical 'Base: type' form
+        symptoms = normalize_symptoms(request_data.get('symptoms', []))
+        try:
+            cycle_day = bulk_io.normalize_cycle_day(request_data.get('cycleDay'))
+        except ValueError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
         comment = request_data.get('comment', '').strip()
         
-        data = load_symptoms()
-        
         # Create entry with timestamp
         entry = {
             "datetime": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
@@ -130,30 +420,288 @@ def save_symptoms_api():
             entry["comment"] = comment
         
         # Replace existing entry for the same date
-        data[date] = [entry]
-        
-        save_symptoms(data)
+        put_symptoms(date, [entry])
         
         return jsonify({"success": True, "message": "Symptoms saved successfully"})
+    except ValueError as e:
+        # Rejected by the store's entry check before anything was written
+        return jsonify({"success": False, "message": str(e)}), 400
     except (IOError, OSError) as e:
         return jsonify({"success": False, "message": f"Failed to save symptoms: {str(e)}"}), 500
     except Exception as e:
         return jsonify({"success": False, "message": f"Unexpected error: {str(e)}"}), 500
 
+@app.route('/api/symptoms/range', methods=['GET'])
+@conditional
+def get_symptoms_range():
+    """Get all entries between two dates (inclusive) in one response"""
+    start = request.args.get('from')
+    end = request.args.get('to')
+    if not start or not end:
+        return jsonify({"success": False, "message": "Both 'from' and 'to' dates are required"}), 400
+    return jsonify(current_shard().store.get_range(start, end))
+
+@app.route('/api/timeline', methods=['GET'])
+@conditional(vary_encoding=True)
+def get_timeline():
+    """Compact timeline for the dashboard chart, limited to the from/to window"""
+    start = request.args.get('from')
+    end = request.args.get('to')
+    from dashboard import encode_timeline
+    shard = current_shard()
+    with shard.store.reading():
+        payload = encode_timeline(shard.dashboard_aggregates.timeline_data(), start, end)
+    return compressed_json(payload)
+
+@app.route('/api/trends', methods=['GET'])
+@conditional
+def get_trends():
+    """Dates on which a symptom was logged, answered from the inverted symptom index
+
+    symptom matches case-insensitively as a substring, like the dashboard
+    trends; match=prefix|exact|base|type narrows it. Optional from/to
+    (inclusive) bound the dates.
+    """
+    query = request.args.get('symptom', '').strip()
+    mode = request.args.get('match', 'substring')
+    if not query:
+        return jsonify({"success": False, "message": "symptom is required"}), 400
+    if mode not in MATCH_MODES:
+        return jsonify({"success": False, "message": f"match must be one of: {', '.join(MATCH_MODES)}"}), 400
+
+    shard = current_shard()
+    with shard.store.reading():
+        symptoms, dates = shard.symptom_index.search(query, mode, request.args.get('from'), request.args.get('to'))
+        cycle_days = [shard.store.cycle_index.cycle_days.get(date) for date in dates]
+    return jsonify({
+        "symptom": query,
+        "matchedSymptoms": symptoms,
+        "dates": dates,
+        "cycleDays": cycle_days,
+        "count": len(dates)
+    })
+
+@app.route('/api/analytics/window', methods=['GET'])
+@conditional
+def get_window_analytics():
+    """Symptom counts for the dates in from/to (inclusive, default: everything)
+
+    Also broken down by cycle phase of the cycleDay. Each window is
+    answered from prefix sums, so its cost does not depend on its length.
+    """
+    from window_stats import CYCLE_PHASES, UNKNOWN_PHASE
+    start = request.args.get('from')
+    end = request.args.get('to')
+    shard = current_shard()
+    try:
+        with shard.store.reading():
+            days, symptoms = shard.window_stats.window(start, end)
+            phases = shard.window_stats.phases(start, end)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    cycle_days = {name: [first, last] for name, first, last in CYCLE_PHASES}
+    cycle_days[UNKNOWN_PHASE] = None
+    return jsonify({
+        "from": start,
+        "to": end,
+        "days": days,
+        "symptoms": symptoms,
+        "phases": {name: {"cycleDays": cycle_days[name], "days": phase_days, "symptoms": phase_symptoms}
+                   for name, (phase_days, phase_symptoms) in phases.items()}
+    })
+
+@app.route('/api/analytics/rolling', methods=['GET'])
+@conditional(vary_encoding=True)
+def get_rolling_analytics():
+    """Trailing-window symptom counts for every step-th day in from/to
+
+    window (repeatable, default 7, 30 and 90) is the window length in
+    days; to defaults to the last logged date and from to a year before
+    it. symptom (repeatable) limits the series. Each point costs one
+    prefix-sum lookup per symptom.
+    """
+    from window_stats import ROLLING_WINDOWS
+    try:
+        windows = [int(value) for value in request.args.getlist('window')] or list(ROLLING_WINDOWS)
+        step = int(request.args.get('step', 1))
+    except ValueError:
+        windows, step = [], 0
+    if not windows or min(windows) <= 0 or step <= 0:
+        return jsonify({"success": False, "message": "window and step must be positive integers"}), 400
+    symptoms = request.args.getlist('symptom') or None
+
+    shard = current_shard()
+    try:
+        with shard.store.reading():
+            end = request.args.get('to') or shard.window_stats.date_range()[1] or datetime.now().strftime('%Y-%m-%d')
+            start = request.args.get('from')
+            if not start:
+                start = datetime.fromordinal(datetime.strptime(end, '%Y-%m-%d').toordinal() - 364).strftime('%Y-%m-%d')
+            if (datetime.strptime(end, '%Y-%m-%d') - datetime.strptime(start, '%Y-%m-%d')).days // step >= MAX_ROLLING_POINTS:
+                return jsonify({"success": False,
+                                "message": f"At most {MAX_ROLLING_POINTS} points per window, use a larger step"}), 400
+            series = {}
+            for window in windows:
+                dates, days, counts = shard.window_stats.rolling(window, start, end, step, symptoms)
+                series[str(window)] = {"days": days, "symptoms": counts}
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    return compressed_json({"from": start, "to": end, "step": step, "dates": dates, "windows": series})
+
+@app.route('/api/correlations', methods=['GET'])
+@conditional(vary_encoding=True)
+def get_correlations():
+    """Symptom co-occurrence, lagged and cycle day association matrices
+
+    Optional from/to (inclusive) limit the days, lag (repeatable, 1 to
+    MAX_CORRELATION_LAG, default 1) sets the day offsets of the lagged
+    matrices and by=base merges the types of a symptom. Results are
+    cached per data version.
+    """
+    from correlations import GROUPINGS
+    try:
+        lags = sorted({int(value) for value in request.args.getlist('lag')}) or [1]
+    except ValueError:
+        lags = [0]
+    if lags[0] < 1 or lags[-1] > MAX_CORRELATION_LAG:
+        return jsonify({"success": False, "message": f"lag must be between 1 and {MAX_CORRELATION_LAG}"}), 400
+    by = request.args.get('by', 'symptom')
+    if by not in GROUPINGS:
+        return jsonify({"success": False, "message": f"by must be one of: {', '.join(GROUPINGS)}"}), 400
+
+    shard = current_shard()
+    try:
+        with shard.store.reading() as data:
+            result = shard.correlations.query(data, request.args.get('from'), request.args.get('to'), lags, by)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    cycle_days = result['cycle_days']
+    return compressed_json({
+        "from": request.args.get('from'),
+        "to": request.args.get('to'),
+        "by": by,
+        "days": result['days'],
+        "symptoms": result['symptoms'],
+        "symptomDays": result['symptom_days'],
+        "cooccurrence": result['cooccurrence'],
+        "lagged": {str(lag): matrices for lag, matrices in result['lagged'].items()},
+        "cycleDays": {
+            "cycleDays": cycle_days['cycle_days'],
+            "days": cycle_days['days'],
+            "counts": cycle_days['counts'],
+            "lift": cycle_days['lift']
+        }
+    })
+
+@app.route('/api/export', methods=['GET'])
+@conditional
+def export_symptoms():
+    """Stream the symptom log as NDJSON (default) or CSV (?format=csv)
+
+    Optional from/to (inclusive) limit the dates. Dates are read from the
+    store a chunk at a time, the full export is never built in memory.
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in bulk_io.EXPORT_FORMATS:
+        return jsonify({"success": False, "message": f"format must be one of: {', '.join(bulk_io.EXPORT_FORMATS)}"}), 400
+
+    pairs = bulk_io.iter_export_pairs(current_shard().store, request.args.get('from'), request.args.get('to'))
+    if export_format == 'csv':
+        body, mimetype = bulk_io.export_csv(pairs), 'text/csv'
+    else:
+        body, mimetype = bulk_io.export_ndjson(pairs), 'application/x-ndjson'
+    response = app.response_class(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="symptom_log.{export_format}"'
+    return response
+
+@app.route('/api/import', methods=['POST'])
+def import_symptoms():
+    """Import an NDJSON or CSV upload (format from ?format= or the Content-Type)
+
+    The body is read as a stream and written in batches of dates (?batch=,
+    default bulk_io.IMPORT_BATCH_DATES) with one store write per batch.
+    Imported dates replace what was stored for them; invalid lines are
+    skipped and reported.
+    """
+    import_format = request.args.get('format')
+    if import_format is None:
+        import_format = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+    if import_format not in bulk_io.EXPORT_FORMATS:
+        return jsonify({"success": False, "message": f"format must be one of: {', '.join(bulk_io.EXPORT_FORMATS)}"}), 400
+    try:
+        batch_size = int(request.args.get('batch', bulk_io.IMPORT_BATCH_DATES))
+    except ValueError:
+        batch_size = 0
+    if batch_size <= 0:
+        return jsonify({"success": False, "message": "batch must be a positive integer"}), 400
+
+    parse = bulk_io.parse_csv if import_format == 'csv' else bulk_io.parse_ndjson
+    shard = current_shard()
+    try:
+        shard.flush()
+        summary = bulk_io.import_records(shard.store, parse(request.stream), batch_size)
+    except (IOError, OSError) as e:
+        log_error(f"Error importing symptoms: {str(e)}")
+        return jsonify({"success": False, "message": f"Failed to import symptoms: {str(e)}"}), 500
+    except UnicodeDecodeError as e:
+        return jsonify({"success": False, "message": f"Upload is not valid UTF-8: {str(e)}"}), 400
+    finally:
+        shard.stats_worker.notify()
+    summary["success"] = True
+    return jsonify(summary)
+
 @app.route('/api/all-dates', methods=['GET'])
+@conditional
 def get_all_dates():
-    """Get all dates with symptom entries"""
-    data = load_symptoms()
-    return jsonify(list(data.keys()))
+    """Get all dates with symptom entries
+
+    Optional filters: from/to (inclusive date bounds). With limit and/or
+    cursor the response is paginated: {"dates": [...], "nextCursor": ...},
+    pass nextCursor back as cursor to get the following page.
+    """
+    start = request.args.get('from')
+    end = request.args.get('to')
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit')
+
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if limit <= 0:
+            return jsonify({"success": False, "message": "limit must be a positive integer"}), 400
+
+    store = current_shard().store
+    if limit is None and cursor is None:
+        if start or end:
+            return jsonify(store.dates_between(start, end))
+        return jsonify(store.dates())
+
+    # Fetch one extra date to know whether another page follows
+    dates = store.dates_between(start, end, after=cursor, limit=limit + 1 if limit else None)
+    next_cursor = None
+    if limit and len(dates) > limit:
+        dates = dates[:limit]
+        next_cursor = dates[-1]
+    return jsonify({"dates": dates, "nextCursor": next_cursor})
 
 @app.route('/api/last-cycle-day', methods=['GET'])
+@conditional
 def get_last_cycle_day_api():
     """Get the last logged cycle day"""
     try:
-        last_cycle = get_last_cycle_day()
+        latest = current_shard().store.last_cycle_entry()
+        last_date, last_cycle = latest if latest else (None, None)
+        predicted, elapsed = predict_cycle_day(last_date, last_cycle) if latest else (None, None)
         return jsonify({
             "success": True,
             "lastCycleDay": last_cycle,
+            "lastCycleDate": last_date,
+            "daysSinceLastCycleDay": elapsed,
+            "predictedCycleDay": predicted,
             "message": "Last cycle day retrieved successfully" if last_cycle is not None else "No previous cycle day found"
         })
     except Exception as e:
@@ -163,21 +711,81 @@ def get_last_cycle_day_api():
         }), 500
 
 @app.route('/dashboard')
+@conditional
 def dashboard():
-    """Dashboard page with data analysis"""
-    data = load_symptoms()
-    stats = get_dashboard_stats(data)
-    return render_template('dashboard.html', stats=stats)
+    """Dashboard page with data analysis (served from the background stats snapshot)"""
+    snapshot = current_shard().stats_worker.get()
+    response = app.make_response(render_page('dashboard.html', stats=snapshot.stats))
+    # Tag the page with the data version it was computed from, so a stale
+    # snapshot is revalidated instead of being cached as the latest page
+    response.set_etag('-'.join(snapshot.key))
+    return response
 
 @app.route('/health')
 def health_check():
-    """Health check endpoint"""
-    return jsonify({
+    """Health check endpoint (add ?verify=1 to check the dashboard aggregates)
+
+    Stays reachable without credentials for monitoring, reporting the
+    default shard. In multi-user mode ?verify=1 needs credentials and
+    checks the caller's shard.
+    """
+    verify = request.args.get('verify')
+    if shard_pool is None or verify or request_user():
+        shard = current_shard()
+    else:
+        shard = default_shard
+    health = {
         "status": "healthy",
         "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        "data_file_exists": os.path.exists(SYMPTOM_FILE),
+        "data_file_exists": os.path.exists(shard.store.path),
+        "store_cache": shard.store.stats(),
+        "dashboard_stats": shard.stats_worker.stats(),
         "base_dir": BASE_DIR
-    })
+    }
+    if shard.write_behind is not None:
+        health["write_behind"] = shard.write_behind.stats()
+    if shard_pool is not None:
+        health["shards"] = shard_pool.stats()
+    if verify:
+        # Full recompute, only on demand
+        with shard.store.reading() as data:
+            health["aggregate_mismatches"] = shard.dashboard_aggregates.verify(data)
+    return jsonify(health)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Request timings, storage timers and cache counters in Prometheus text format"""
+    return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def warm_up():
+    """Prepare a worker before its first request
+
+    Compiles all templates (filling the bytecode cache), and in
+    single-user mode loads the data and computes the dashboard snapshot,
+    which also imports the analytics. Starts no threads, so it is safe
+    to run before workers are forked.
+    """
+    started = time.perf_counter()
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    if shard_pool is None:
+        default_shard.store.load()
+        default_shard.stats_worker.recompute()
+    metrics.STARTUP_SECONDS.set(time.perf_counter() - started, phase='warm_up')
+
+def post_fork(server=None, worker=None):
+    """Gunicorn post_fork hook (use from a gunicorn config): warm up the new worker"""
+    warm_up()
+
+STARTUP_IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
+metrics.STARTUP_SECONDS.set(STARTUP_IMPORT_SECONDS, phase='import')
+
+if WARM_UP:
+    try:
+        import uwsgidecorators
+        uwsgidecorators.postfork(warm_up)
+    except ImportError:  # not running under uWSGI, warm up right away
+        warm_up()
 
 # This is required for PythonAnywhere
 application = app
@@ -0,0 +1,169 @@
+#!/usr/bin/python3.10
+
+"""
+Metrics for Symptom Tracker
+Small in-process counters, gauges and histograms rendered in the Prometheus text
+exposition format by the /metrics endpoint. Every worker process keeps
+its own values, like prometheus_client without multiprocess mode.
+"""
+
+import contextlib
+import threading
+import time
+
+# Seconds; covers cached reads (sub-millisecond) up to full rewrites of a large log
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REGISTRY = []
+
+
+def _escape(value):
+    """Escape a label value for the text format"""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, values, extra=()):
+    """Return '{a="1",b="2"}' for label values (empty string without labels)"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    """Format a sample value (integers without a trailing .0)"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonically increasing count, optionally split by labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount=1, **labels):
+        """Add amount to the series selected by labels"""
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        """Yield the exposition lines of all series"""
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge:
+    """Value that can go up and down, optionally split by labels"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def set(self, value, **labels):
+        """Set the series selected by labels"""
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self):
+        """Yield the exposition lines of all series"""
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram:
+    """Distribution of observed durations in cumulative buckets, optionally split by labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value, **labels):
+        """Record one observation in the series selected by labels"""
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        """Yield the exposition lines of all series"""
+        with self._lock:
+            series_list = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in series_list:
+            for bound, count in zip(self.buckets, series):
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])
+                yield f"{self.name}_bucket{labels} {count}"
+            labels = _format_labels(self.labelnames, key, [('le', '+Inf')])
+            yield f"{self.name}_bucket{labels} {series[-1]}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-2])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}"
+
+
+def render():
+    """Return all registered metrics in the Prometheus text format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+
+# Hot-path instrumentation shared by the store, the stats worker and the app
+REQUEST_DURATION = Histogram('symptom_http_request_duration_seconds', 'Request handling time by route.',
+                             ('route', 'method', 'status'))
+JSON_LOAD_DURATION = Histogram('symptom_json_load_seconds', 'Time to read and parse the symptom data from disk.')
+JSON_SAVE_DURATION = Histogram('symptom_json_save_seconds', 'Time to serialize and write the symptom data to disk.')
+STATS_DURATION = Histogram('symptom_stats_compute_seconds', 'Time to compute the dashboard stats snapshot.')
+TEMPLATE_DURATION = Histogram('symptom_template_render_seconds', 'Template render time.', ('template',))
+BYTES_READ = Counter('symptom_bytes_read_total', 'Bytes of symptom data read from disk.')
+BYTES_WRITTEN = Counter('symptom_bytes_written_total', 'Bytes of symptom data written to disk.')
+STARTUP_SECONDS = Gauge('symptom_startup_seconds',
+                        'Cold start of this worker: app module import, optional warm-up, first request, and import plus first request.', ('phase',))
+CACHE_LOOKUPS = Counter('symptom_store_cache_total', 'Store cache lookups by result (hit or miss).', ('result',))
+WRITE_QUEUE_DEPTH = Gauge('symptom_write_queue_depth', 'Dates saved in write-behind mode and not yet flushed to the store.')
+WRITE_FLUSH_DURATION = Histogram('symptom_write_flush_seconds', 'Time to flush a write-behind batch to the store.')
+WRITE_FLUSH_DATES = Histogram('symptom_write_flush_dates', 'Dates per write-behind flush.',
+                              buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000))
+WRITES_COALESCED = Counter('symptom_writes_coalesced_total', 'Write-behind saves that replaced a queued save of the same date.')
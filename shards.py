@@ -0,0 +1,180 @@
+#!/usr/bin/python3.10
+
+"""
+Per-user storage shards for Symptom Tracker
+Each user gets their own data directory, and with it their own store,
+file lock, dashboard aggregates, window stats, symptom index and stats
+worker, so users never contend with each other. Directories fan out on a
+hash of the user id (users/ab/cd/<hash>/) to keep directories small and
+user ids out of file paths. Open shards are kept in a bounded LRU.
+"""
+
+from collections import OrderedDict
+import hashlib
+import os
+import threading
+
+import metrics
+from stats_worker import StatsWorker
+from symptom_index import SymptomIndex
+from symptom_store import open_store
+from symptom_vocab import SymptomVocabulary
+from write_behind import WriteBehindQueue
+
+
+class Shard:
+    """One data set: the store plus the views and stats worker built on it"""
+
+    def __init__(self, data_dir, backend='json', write_behind_latency=None):
+        self.data_dir = data_dir
+        filename = 'symptom_log.db' if backend == 'sqlite' else 'symptom_log.json'
+        self.store = open_store(os.path.join(data_dir, filename), backend)
+
+        # Optional journaled write-behind queue for single-date saves
+        self.write_behind = None
+        if write_behind_latency is not None:
+            self.write_behind = WriteBehindQueue(self.store, write_behind_latency)
+
+        self._aggregates = None
+        self._window_stats = None
+        self._correlations = None
+
+        # Parsed symptom strings shared by the views below, dropped with the shard
+        self.vocabulary = SymptomVocabulary()
+
+        # Symptom -> dates postings for /api/trends
+        self.symptom_index = SymptomIndex(self.vocabulary)
+        self.store.add_view(self.symptom_index)
+
+        # Dashboard stats recomputed in the background after writes and at midnight
+        self.stats_worker = StatsWorker(self.store, self.compute_dashboard_stats)
+
+    @property
+    def dashboard_aggregates(self):
+        """Dashboard statistics updated on every save instead of recomputed per request
+
+        Created on first use so dashboard.py is only imported by workers
+        that serve the dashboard; registering the view late rebuilds it
+        from the already loaded data.
+        """
+        if self._aggregates is None:
+            # The store lock (reentrant) also guards creation, so callers may hold it
+            with self.store.reading():
+                if self._aggregates is None:
+                    from dashboard import DashboardAggregates
+                    aggregates = DashboardAggregates(self.vocabulary)
+                    self.store.add_view(aggregates)
+                    self._aggregates = aggregates
+        return self._aggregates
+
+    @property
+    def window_stats(self):
+        """Prefix sums for /api/analytics, created on first use like the aggregates"""
+        if self._window_stats is None:
+            with self.store.reading():
+                if self._window_stats is None:
+                    from window_stats import WindowStats
+                    window_stats = WindowStats(self.vocabulary)
+                    self.store.add_view(window_stats)
+                    self._window_stats = window_stats
+        return self._window_stats
+
+    @property
+    def correlations(self):
+        """Correlation engine for /api/correlations, cached on the store's data version"""
+        if self._correlations is None:
+            from correlations import CorrelationEngine
+            self._correlations = CorrelationEngine(self.store, self.vocabulary)
+        return self._correlations
+
+    def compute_dashboard_stats(self, data):
+        """Build the stats snapshot for the dashboard page
+
+        The page loads its chart from /api/timeline, so the timeline (which
+        shares dicts the aggregates keep mutating) is left out.
+        """
+        from dashboard import get_dashboard_stats
+        with metrics.STATS_DURATION.time():
+            stats = get_dashboard_stats(data, self.dashboard_aggregates)
+        del stats['timeline_data']
+        return stats
+
+    def put(self, date, entries):
+        """Save a single date, through the write-behind queue when enabled"""
+        if self.write_behind is not None:
+            self.write_behind.submit(date, entries)
+        else:
+            self.store.put(date, entries)
+        self.stats_worker.notify()
+
+    def flush(self):
+        """Write queued write-behind saves now (before writes that bypass the queue)"""
+        if self.write_behind is not None:
+            self.write_behind.flush()
+
+    def close(self):
+        """Stop background work; requests still holding the shard keep working"""
+        self.stats_worker.stop()
+        if self.write_behind is not None:
+            self.write_behind.stop()
+
+
+def shard_directory(root, user_id):
+    """Return the fan-out data directory of a user: root/users/ab/cd/<sha256>"""
+    digest = hashlib.sha256(user_id.encode('utf-8')).hexdigest()
+    return os.path.join(root, 'users', digest[:2], digest[2:4], digest)
+
+
+class ShardPool:
+    """Lazily opened per-user shards, at most max_open kept open (least recently used evicted)"""
+
+    def __init__(self, root, backend='json', max_open=64, write_behind_latency=None):
+        self.root = root
+        self.backend = backend
+        self.max_open = max_open
+        self.write_behind_latency = write_behind_latency
+        self._shards = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters for monitoring
+        self.opened = 0
+        self.evictions = 0
+
+    def get(self, user_id):
+        """Return the shard of a user, opening it on first use"""
+        with self._lock:
+            shard = self._shards.get(user_id)
+            if shard is not None:
+                self._shards.move_to_end(user_id)
+                return shard
+
+        # Open outside the pool lock so a slow first load does not block other users
+        data_dir = shard_directory(self.root, user_id)
+        os.makedirs(data_dir, exist_ok=True)
+        shard = Shard(data_dir, self.backend, self.write_behind_latency)
+
+        evicted = []
+        with self._lock:
+            existing = self._shards.get(user_id)
+            if existing is not None:
+                self._shards.move_to_end(user_id)
+                return existing
+            self._shards[user_id] = shard
+            self.opened += 1
+            while len(self._shards) > self.max_open:
+                evicted.append(self._shards.popitem(last=False)[1])
+                self.evictions += 1
+
+        for old_shard in evicted:
+            old_shard.close()
+        return shard
+
+    def stats(self):
+        """Return pool counters for monitoring"""
+        with self._lock:
+            return {
+                'open_shards': len(self._shards),
+                'max_open': self.max_open,
+                'opened': self.opened,
+                'evictions': self.evictions
+            }
@@ -0,0 +1,147 @@
+#!/usr/bin/python3.10
+
+"""
+Background dashboard stats for Symptom Tracker
+A worker thread keeps a snapshot of the dashboard statistics up to date,
+recomputing it after writes and when the day rolls over (recent_entries
+depends on today's date). Requests always get the latest snapshot right
+away, even while a newer one is being computed (stale-while-revalidate).
+"""
+
+from datetime import datetime, timedelta
+import os
+import threading
+import time
+
+
+class StatsSnapshot:
+    """Dashboard stats computed for one data version and day"""
+
+    __slots__ = ('stats', 'key', 'computed_at', 'duration')
+
+    def __init__(self, stats, key, computed_at, duration):
+        self.stats = stats
+        self.key = key
+        self.computed_at = computed_at
+        self.duration = duration
+
+
+class StatsWorker:
+    """Recomputes a stats snapshot in a background thread
+
+    compute(data) builds the stats from the store's data. The snapshot is
+    keyed by (data ETag, today's date); the worker wakes up on notify()
+    (after a write in this process), at midnight, and every poll_interval
+    seconds to pick up writes made by other worker processes.
+
+    The thread is started lazily on first use in each process, so it also
+    runs in workers forked after the app module was imported.
+    """
+
+    def __init__(self, store, compute, poll_interval=5):
+        self.store = store
+        self.compute = compute
+        self.poll_interval = poll_interval
+        self.snapshot = None
+        self._wake = threading.Event()
+        self._compute_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stopped = False
+
+        # Counters for monitoring
+        self.recomputes = 0
+        self.errors = 0
+        self.last_error = None
+
+    def current_key(self):
+        """Return the (data ETag, day) the snapshot should be computed for"""
+        return self.store.validators()[0], datetime.now().strftime('%Y%m%d')
+
+    def _ensure_thread(self):
+        """Start the worker thread in this process if it is not running"""
+        if self._stopped or (self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()):
+            return
+        with self._thread_lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='stats-worker', daemon=True)
+                self._thread.start()
+
+    def recompute(self):
+        """Compute a fresh snapshot now and return it"""
+        with self._compute_lock:
+            key = self.current_key()
+            snapshot = self.snapshot
+            if snapshot is not None and snapshot.key == key:
+                return snapshot
+
+            started = time.perf_counter()
+            with self.store.reading() as data:
+                stats = self.compute(data)
+            # Another process may have saved while we computed; the next wake-up catches it
+            snapshot = StatsSnapshot(stats, key, time.time(), time.perf_counter() - started)
+            self.snapshot = snapshot
+            self.recomputes += 1
+            return snapshot
+
+    def _seconds_until_midnight(self):
+        """Return how long until the day rolls over"""
+        now = datetime.now()
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return (midnight - now).total_seconds()
+
+    def _run(self):
+        """Worker loop: recompute whenever the snapshot is out of date"""
+        while not self._stopped:
+            self._wake.wait(min(self.poll_interval, self._seconds_until_midnight() + 0.5))
+            self._wake.clear()
+            if self._stopped:
+                break
+            try:
+                snapshot = self.snapshot
+                if snapshot is None or snapshot.key != self.current_key():
+                    self.recompute()
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+
+    def stop(self):
+        """Stop the worker thread; get() then recomputes stale snapshots itself"""
+        self._stopped = True
+        self._wake.set()
+
+    def notify(self):
+        """Ask the worker to recompute soon (call after a write)"""
+        self._ensure_thread()
+        self._wake.set()
+
+    def get(self):
+        """Return the latest snapshot, computing one only if none exists yet
+
+        A snapshot for an older data version or day is returned as is and
+        the worker is woken up to replace it.
+        """
+        self._ensure_thread()
+        snapshot = self.snapshot
+        if snapshot is None:
+            return self.recompute()
+        if snapshot.key != self.current_key():
+            if self._stopped:
+                return self.recompute()
+            self._wake.set()
+        return snapshot
+
+    def stats(self):
+        """Return snapshot age and recompute timings for monitoring"""
+        snapshot = self.snapshot
+        return {
+            'snapshot_age_seconds': round(time.time() - snapshot.computed_at, 3) if snapshot else None,
+            'snapshot_stale': snapshot is None or snapshot.key != self.current_key(),
+            'last_recompute_ms': round(snapshot.duration * 1000, 2) if snapshot else None,
+            'recomputes': self.recomputes,
+            'errors': self.errors,
+            'last_error': self.last_error,
+            'worker_alive': self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+        }
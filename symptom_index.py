@@ -0,0 +1,115 @@
+#!/usr/bin/python3.10
+
+"""
+Inverted symptom index for Symptom Tracker
+Maps every symptom (and its base and type) to the sorted dates whose
+latest entry contains it, so a per-symptom query touches only the
+matching dates instead of walking the whole history.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+import heapq
+
+from symptom_vocab import SymptomVocabulary
+
+MATCH_MODES = ('substring', 'prefix', 'exact', 'base', 'type')
+
+
+def _latest_symptoms(entries):
+    """Return the symptoms of the latest entry (the one the dashboard uses)"""
+    if entries and isinstance(entries, list):
+        return entries[-1].get('symptoms', [])
+    return []
+
+
+class SymptomIndex:
+    """Symptom -> sorted dates postings kept in sync with the store (a store view)
+
+    Postings are keyed by symptom_vocab record id. A sorted list of the
+    lowercased symptom strings in use answers prefix queries with a binary
+    search; substring, base and type queries scan the distinct symptoms
+    once, never the days.
+    """
+
+    def __init__(self, vocabulary=None):
+        self.vocabulary = SymptomVocabulary() if vocabulary is None else vocabulary
+        self.rebuild({})
+
+    def _records(self, entries):
+        """Return the distinct records of an entry list's latest entry"""
+        records = {}
+        for symptom in _latest_symptoms(entries):
+            if isinstance(symptom, str):
+                record = self.vocabulary.record(symptom)
+                records[record.id] = record
+        return records.values()
+
+    def rebuild(self, data):
+        """Rebuild all postings from the full history"""
+        self.postings = {}
+        for date in sorted(data):
+            for record in self._records(data[date]):
+                self.postings.setdefault(record.id, []).append(date)
+        self.sorted_names = sorted((self.vocabulary.lower[record_id], record_id) for record_id in self.postings)
+
+    def apply(self, date, old_entries, new_entries):
+        """Move one date between postings"""
+        for record in self._records(old_entries):
+            dates = self.postings[record.id]
+            del dates[bisect_left(dates, date)]
+            if not dates:
+                del self.postings[record.id]
+                del self.sorted_names[bisect_left(self.sorted_names, (self.vocabulary.lower[record.id], record.id))]
+        for record in self._records(new_entries):
+            dates = self.postings.get(record.id)
+            if dates is None:
+                dates = self.postings[record.id] = []
+                insort(self.sorted_names, (self.vocabulary.lower[record.id], record.id))
+            insort(dates, date)
+
+    def lookup(self, query, mode='substring'):
+        """Return the ids of the indexed symptoms matching query (case-insensitive)
+
+        Modes: 'substring' (like get_symptom_trends), 'prefix', 'exact',
+        'base' and 'type' (exact match on the part before/after the colon).
+        """
+        needle = query.strip().lower()
+        if mode == 'prefix' or mode == 'exact':
+            lo = bisect_left(self.sorted_names, (needle,))
+            record_ids = []
+            for name, record_id in self.sorted_names[lo:]:
+                if not name.startswith(needle) or (mode == 'exact' and name != needle):
+                    break
+                record_ids.append(record_id)
+            return record_ids
+        if mode == 'base' or mode == 'type':
+            names = self.vocabulary.bases if mode == 'base' else self.vocabulary.types
+            return [record_id for record_id in self.postings
+                    if names[getattr(self.vocabulary.by_id[record_id], mode + '_id')].lower() == needle]
+        if mode == 'substring':
+            return [record_id for name, record_id in self.sorted_names if needle in name]
+        raise ValueError(f"Unknown match mode: {mode}")
+
+    def dates(self, record_ids, start=None, end=None):
+        """Return the sorted, distinct dates in [start, end] for any of the records"""
+        runs = []
+        for record_id in record_ids:
+            dates = self.postings.get(record_id, [])
+            lo = bisect_left(dates, start) if start else 0
+            hi = bisect_right(dates, end) if end else len(dates)
+            if lo < hi:
+                runs.append(dates[lo:hi])
+        if len(runs) == 1:
+            return runs[0]
+
+        merged = []
+        for date in heapq.merge(*runs):
+            if not merged or merged[-1] != date:
+                merged.append(date)
+        return merged
+
+    def search(self, query, mode='substring', start=None, end=None):
+        """Return (matched symptom strings, matching dates) for a query"""
+        record_ids = self.lookup(query, mode)
+        symptoms = sorted(self.vocabulary.by_id[record_id].raw for record_id in record_ids)
+        return symptoms, self.dates(record_ids, start, end)
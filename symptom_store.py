@@ -0,0 +1,1113 @@
+#!/usr/bin/python3.10
+
+"""
+Storage module for Symptom Tracker
+Keeps the parsed symptom log in memory and only re-reads it from disk
+when the underlying file has changed
+
+Three storage backends are available:
+- 'json': every save rewrites data/symptom_log.json (default)
+- 'journal': each save appends one line to data/symptom_log.json.journal,
+  which is folded back into the JSON snapshot once it grows past a threshold
+- 'sqlite': entries live in data/symptom_log.db with an index on the date
+
+iter_symptom_file() streams (date, entries) pairs from a JSON log without
+loading it whole (the SQLite migration below uses it), and find_date()
+looks up a single date by streaming or through a byte offset side index.
+
+Migrate an existing JSON log to SQLite with:
+    python symptom_store.py migrate data/symptom_log.json data/symptom_log.db
+"""
+
+import codecs
+import contextlib
+import hashlib
+import json
+from bisect import bisect_left, bisect_right, insort
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows (local development)
+    fcntl = None
+    import msvcrt
+
+from metrics import BYTES_READ, BYTES_WRITTEN, CACHE_LOOKUPS, JSON_LOAD_DURATION, JSON_SAVE_DURATION
+from symptom_vocab import share_symptom_strings
+
+
+def file_signature(path):
+    """Return (mtime, size, inode) for a file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def atomic_write_json(path, data, **dump_kwargs):
+    """Write JSON to a temp file and rename it over path
+
+    Readers see either the old or the new document, never a truncated one.
+    Counted in the save metrics; use _replace_json() for files that are not
+    symptom data.
+    """
+    started = time.perf_counter()
+    size = _replace_json(path, data, **dump_kwargs)
+    BYTES_WRITTEN.inc(size)
+    JSON_SAVE_DURATION.observe(time.perf_counter() - started)
+
+
+def _replace_json(path, data, **dump_kwargs):
+    """Atomically replace path with a JSON document and return its size in bytes"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+            size = os.fstat(f.fileno()).st_size
+
+        # mkstemp creates the file as 0600, keep the mode of the file being replaced
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return size
+
+
+class FileLock:
+    """Reentrant inter-process lock held on a sidecar .lock file
+
+    Used around read-modify-write cycles so several WSGI workers cannot
+    lose each other's updates.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+
+    def acquire(self):
+        """Block until this process holds the lock"""
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            except BaseException:
+                os.close(fd)
+                self._thread_lock.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+
+    def release(self):
+        """Release one level of the lock"""
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(self._fd, 0, os.SEEK_SET)
+                    msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class _JsonStreamReader:
+    """Incrementally decodes JSON values from a binary file, tracking byte offsets"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.base = 0  # byte offset of buffer[0] in the file
+        self.eof = False
+
+    def _fill(self):
+        """Read the next chunk into the buffer; returns False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            self.buffer += self.utf8.decode(b'', final=True)
+            return False
+        self.buffer += self.utf8.decode(chunk)
+        return True
+
+    def peek(self):
+        """Skip whitespace and return the next character ('' at end of file)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        """Consume the given structural character or raise"""
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def value(self):
+        """Decode the JSON value at the current position"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A value that ends exactly at the buffer end may be a truncated number
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def offset(self):
+        """Return the byte offset of the current position"""
+        return self.base + len(self.buffer[:self.pos].encode('utf-8'))
+
+    def discard(self):
+        """Drop the consumed part of the buffer"""
+        self.base = self.offset()
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+
+
+def iter_symptom_file(path, chunk_size=64 * 1024, offsets=False):
+    """Yield (date, entries) pairs from a symptom log one date at a time
+
+    Only one date's entries are decoded and held in memory at a time, so
+    memory stays flat however large the file grows. With offsets=True,
+    yields (date, entries, offset, length) where offset/length locate the
+    entries array in the file in bytes. A missing file yields nothing; a
+    malformed one raises json.JSONDecodeError.
+    """
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return
+
+    with f:
+        reader = _JsonStreamReader(f, chunk_size)
+        if reader.peek() == '':
+            return
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+
+        while True:
+            date = reader.value()
+            reader.expect(':')
+            reader.peek()
+            start = reader.offset()
+            entries = reader.value()
+            if offsets:
+                yield date, entries, start, reader.offset() - start
+            else:
+                yield date, entries
+            reader.discard()
+
+            if reader.peek() == '}':
+                return
+            reader.expect(',')
+
+
+def build_offset_index(path):
+    """Scan a symptom log once and return {date: (offset, length)} of each entries array"""
+    return {date: (offset, length) for date, _, offset, length in iter_symptom_file(path, offsets=True)}
+
+
+def load_offset_index(path):
+    """Return the byte offset index of a symptom log, cached in a .offsets side file
+
+    The side file records the log's stat signature and is rebuilt whenever
+    the log has changed since it was written.
+    """
+    index_path = path + '.offsets'
+    signature = file_signature(path)
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('signature') == list(signature or ()):
+            return {date: tuple(location) for date, location in cached['offsets'].items()}
+    except (FileNotFoundError, ValueError, KeyError, AttributeError):
+        pass
+
+    offsets = build_offset_index(path)
+    if signature is not None and file_signature(path) == signature:
+        _replace_json(index_path, {'signature': list(signature), 'offsets': offsets})
+    return offsets
+
+
+def find_date(path, date, offsets=None):
+    """Return the entries for one date without parsing the whole log
+
+    With an offset index (see load_offset_index) this is a single seek and
+    read; without one the file is streamed and scanning stops at the match.
+    """
+    if offsets is not None:
+        location = offsets.get(date)
+        if location is None:
+            return []
+        with open(path, 'rb') as f:
+            f.seek(location[0])
+            return json.loads(f.read(location[1]).decode('utf-8'))
+
+    for found_date, entries in iter_symptom_file(path):
+        if found_date == date:
+            return entries
+    return []
+
+
+def check_entries(date, entries):
+    """Raise ValueError unless a date's entries have the shape the views rely on
+
+    The date is a string and entries a list of objects whose symptoms (if
+    any) are strings and whose cycleDay (if any) is an integer. Checked
+    before single-date writes, so a bad value is rejected instead of being
+    written and then failing every view rebuild on reload.
+    """
+    if not isinstance(date, str):
+        raise ValueError("date must be a string")
+    if not isinstance(entries, list):
+        raise ValueError(f"{date}: entries must be a list")
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise ValueError(f"{date}: each entry must be an object")
+        symptoms = entry.get('symptoms', [])
+        if not isinstance(symptoms, list) or not all(isinstance(symptom, str) for symptom in symptoms):
+            raise ValueError(f"{date}: symptoms must be a list of strings")
+        cycle_day = entry.get('cycleDay')
+        if cycle_day is not None and (not isinstance(cycle_day, int) or isinstance(cycle_day, bool)):
+            raise ValueError(f"{date}: cycleDay must be an integer")
+
+
+def latest_datetime(entries):
+    """Return the newest 'datetime' of a date's entries ('' if none has one)
+
+    Entry datetimes are 'YYYY-MM-DD HH:MM:SS' strings, so they compare in
+    time order as strings.
+    """
+    datetimes = [entry.get('datetime') for entry in entries or () if isinstance(entry, dict)]
+    return max((value for value in datetimes if isinstance(value, str)), default='')
+
+
+def _latest_mtime(signature):
+    """Return the newest mtime_ns found in a (possibly nested) stat signature"""
+    if signature is None:
+        return 0
+    if isinstance(signature[0], int):
+        return signature[0]
+    return max(_latest_mtime(part) for part in signature)
+
+
+def _total_size(signature):
+    """Return the summed file sizes found in a (possibly nested) stat signature"""
+    if signature is None:
+        return 0
+    if isinstance(signature[0], int):
+        return signature[1]
+    return sum(_total_size(part) for part in signature)
+
+
+class DateIndex:
+    """Sorted list of date keys kept in sync with the store (a store view)"""
+
+    def __init__(self):
+        self.dates = []
+
+    def rebuild(self, data):
+        """Re-sort all date keys"""
+        self.dates = sorted(data)
+
+    def apply(self, date, old_entries, new_entries):
+        """Insert or remove a single date"""
+        index = bisect_left(self.dates, date)
+        exists = index < len(self.dates) and self.dates[index] == date
+        if new_entries is None and exists:
+            del self.dates[index]
+        elif new_entries is not None and not exists:
+            self.dates.insert(index, date)
+
+    def between(self, start=None, end=None, after=None, limit=None):
+        """Return sorted dates with start <= date <= end and date > after"""
+        lo = bisect_left(self.dates, start) if start else 0
+        if after:
+            lo = max(lo, bisect_right(self.dates, after))
+        hi = bisect_right(self.dates, end) if end else len(self.dates)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return self.dates[lo:hi]
+
+
+class CycleDayIndex:
+    """Dates whose latest entry has a cycleDay, kept sorted (a store view)
+
+    The last element is the pointer to the newest cycle day. Backdated saves
+    land in the middle of the list and overwrites that drop cycleDay remove
+    their date, so the pointer falls back to the previous date with one.
+    """
+
+    def __init__(self):
+        self.dates = []
+        self.cycle_days = {}
+
+    @staticmethod
+    def _cycle_day(entries):
+        """Return the cycleDay of the latest entry, or None"""
+        if entries and isinstance(entries, list):
+            return entries[-1].get('cycleDay')
+        return None
+
+    def rebuild(self, data):
+        """Re-collect all dates that have a cycle day"""
+        self.cycle_days = {}
+        for date, entries in data.items():
+            cycle_day = self._cycle_day(entries)
+            if cycle_day is not None:
+                self.cycle_days[date] = cycle_day
+        self.dates = sorted(self.cycle_days)
+
+    def apply(self, date, old_entries, new_entries):
+        """Update the index for a single date"""
+        cycle_day = self._cycle_day(new_entries)
+        if date in self.cycle_days:
+            if cycle_day is None:
+                del self.cycle_days[date]
+                del self.dates[bisect_left(self.dates, date)]
+            else:
+                self.cycle_days[date] = cycle_day
+        elif cycle_day is not None:
+            self.cycle_days[date] = cycle_day
+            insort(self.dates, date)
+
+    def latest(self):
+        """Return (date, cycle_day) of the newest date with a cycle day, or None"""
+        if not self.dates:
+            return None
+        date = self.dates[-1]
+        return date, self.cycle_days[date]
+
+
+def _last_line_end(f, end, block_size=4096):
+    """Return the offset just past the last newline before end in a binary file (0 if none)"""
+    while end > 0:
+        start = max(end - block_size, 0)
+        f.seek(start)
+        newline = f.read(end - start).rfind(b'\n')
+        if newline >= 0:
+            return start + newline + 1
+        end = start
+    return 0
+
+
+class SymptomStore:
+    """JSON file backed symptom store with an in-process cache"""
+
+    # Whether stage() can be used (reads must all go through the cached data)
+    supports_staging = True
+
+    def __init__(self, path):
+        self.path = path
+        self._data = {}
+        self._signature = None
+        # Written to memory by stage() but not to disk yet: date -> entries
+        self._staged = {}
+        # What the file holds for the staged dates: date -> entries (None if absent)
+        self._shadowed = {}
+        self._staged_version = 0
+        self._staged_at = 0.0
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(path + '.lock')
+        self._views = []
+
+        # Sorted date index for range queries and the latest cycle day pointer
+        self.date_index = DateIndex()
+        self.cycle_index = CycleDayIndex()
+        self._views.extend([self.date_index, self.cycle_index])
+
+        # Bumped whenever the cached document changes (reload or write)
+        self.version = 0
+
+        # Counters for monitoring cache effectiveness
+        self.hits = 0
+        self.reloads = 0
+
+    def _stat_signature(self):
+        """Return a tuple identifying the current on-disk version of the file"""
+        return file_signature(self.path)
+
+    def _read(self):
+        """Parse the symptom file from disk"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _refresh(self):
+        """Reload the cached document if the file changed since the last read"""
+        signature = self._stat_signature()
+        if signature is not None and signature == self._signature:
+            self.hits += 1
+            CACHE_LOOKUPS.inc(result='hit')
+            return
+
+        CACHE_LOOKUPS.inc(result='miss')
+        # Re-read if another process replaced the file while we were reading it
+        with JSON_LOAD_DURATION.time():
+            while True:
+                data = self._read()
+                BYTES_READ.inc(_total_size(signature))
+                current = self._stat_signature()
+                if current == signature:
+                    break
+                signature = current
+
+        # Repeated symptom strings share one object instead of one per entry
+        strings = {}
+        for entries in data.values():
+            share_symptom_strings(entries, strings)
+        # Staged dates stay ahead of what is on disk
+        self._shadowed = {date: data.get(date) for date in self._staged}
+        data.update(self._staged)
+        self._replace_data(data)
+        self._signature = signature
+        self.reloads += 1
+
+    def _replace_data(self, data):
+        """Swap in a new document and rebuild the registered views"""
+        changed = data is not self._data
+        self._data = data
+        if changed:
+            self.version += 1
+            for view in self._views:
+                view.rebuild(data)
+
+    def _apply(self, date, old_entries, new_entries):
+        """Record a single-date change in the cached document and the views"""
+        self._data[date] = new_entries
+        self.version += 1
+        for view in self._views:
+            view.apply(date, old_entries, new_entries)
+
+    def validators(self):
+        """Return (etag, last_modified) describing the on-disk data
+
+        Derived from the files' mtime/size/inode with a single stat per file,
+        so every worker agrees on them and they change on every save without
+        loading the data. last_modified is a POSIX timestamp (0 if no data).
+        While staged writes are pending they are part of the validators.
+        """
+        signature = self._stat_signature()
+        last_modified = _latest_mtime(signature) / 1e9
+        if self._staged:
+            signature = (signature, os.getpid(), self._staged_version)
+            last_modified = max(last_modified, self._staged_at)
+        etag = hashlib.blake2b(repr(signature).encode(), digest_size=12).hexdigest()
+        return etag, last_modified
+
+    def add_view(self, view):
+        """Register a derived structure that is kept in sync with the data
+
+        Views implement rebuild(data), called whenever the document is
+        (re)loaded, and apply(date, old_entries, new_entries), called for
+        single-date writes. old_entries is None when the date is new.
+        """
+        with self._lock:
+            self._views.append(view)
+            if self._signature is not None:
+                view.rebuild(self._data)
+
+    @contextlib.contextmanager
+    def reading(self):
+        """Hold the store lock while reading the data and its views"""
+        with self._lock:
+            self._refresh()
+            yield self._data
+
+    @contextlib.contextmanager
+    def _write_lock(self):
+        """Serialize writers across threads and worker processes"""
+        with self._lock, self._file_lock:
+            yield
+
+    def load(self):
+        """Return the symptom log as a dict keyed by 'YYYY-MM-DD'
+
+        The returned dict is shared between requests and must not be mutated;
+        use save() to persist changes.
+        """
+        with self._lock:
+            self._refresh()
+            return self._data
+
+    def save(self, data):
+        """Write the full symptom log to disk and update the cache"""
+        with self._write_lock():
+            atomic_write_json(self.path, data, indent=2)
+            self._replace_data(data)
+            self._signature = self._stat_signature()
+
+    def put(self, date, entries):
+        """Replace the entries stored for a single date
+
+        The load-modify-save cycle runs under the inter-process lock so
+        concurrent workers never overwrite each other's dates.
+        """
+        check_entries(date, entries)
+        with self._write_lock():
+            self._refresh()
+            old_entries = self._data.get(date)
+            data = dict(self._data)
+            data[date] = entries
+            atomic_write_json(self.path, data, indent=2)
+
+            # Swap dicts so readers holding the previous one see a stable document
+            self._data = data
+            self._apply(date, old_entries, entries)
+            self._signature = self._stat_signature()
+
+    def put_many(self, updates):
+        """Replace the entries of several dates ({date: entries}) with a single write and fsync"""
+        for date, entries in updates.items():
+            check_entries(date, entries)
+        with self._write_lock():
+            self._refresh()
+            previous = self._data
+            data = dict(previous)
+            data.update(updates)
+            atomic_write_json(self.path, data, indent=2)
+
+            self._data = data
+            for date, entries in updates.items():
+                self._apply(date, previous.get(date), entries)
+            self._signature = self._stat_signature()
+
+    def stage(self, date, entries):
+        """Replace the entries of a date in memory only (write-behind)
+
+        The staged entries are visible to all readers of this process and
+        survive reloads from disk until unstage() is called after they were
+        written with put_many().
+        """
+        check_entries(date, entries)
+        with self._lock:
+            self._refresh()
+            old_entries = self._data.get(date)
+            data = dict(self._data)
+            data[date] = entries
+            self._data = data
+            if date not in self._staged:
+                self._shadowed[date] = old_entries
+            self._staged[date] = entries
+            self._staged_version += 1
+            self._staged_at = time.time()
+            self._apply(date, old_entries, entries)
+
+    def unstage(self, updates):
+        """Forget staged dates that have been written with the given entries"""
+        with self._lock:
+            for date, entries in updates.items():
+                if self._staged.get(date) is entries:
+                    del self._staged[date]
+                    del self._shadowed[date]
+
+    def put_newer(self, updates):
+        """put_many() the dates of updates that are not older than what is stored
+
+        A date whose stored latest entry has a later 'datetime' was saved
+        again elsewhere after the update was queued (a write-behind journal
+        being replayed, or another worker saving while this one had it
+        staged); it is left alone and its staged entries are dropped.
+        Returns the {date: entries} that were written.
+        """
+        with self._write_lock():
+            self._refresh()
+            newer = {}
+            for date, entries in updates.items():
+                stored = self._shadowed[date] if date in self._staged else self._data.get(date)
+                if latest_datetime(stored) <= latest_datetime(entries):
+                    newer[date] = entries
+                elif date in self._staged:
+                    del self._staged[date]
+                    del self._shadowed[date]
+                    old_entries = self._data.get(date)
+                    data = dict(self._data)
+                    data[date] = stored
+                    self._data = data
+                    self._apply(date, old_entries, stored)
+            if newer:
+                self.put_many(newer)
+            return newer
+
+    def get(self, date):
+        """Return the entries logged for a date (empty list if none)"""
+        return self.load().get(date, [])
+
+    def dates(self):
+        """Return all dates that have an entry"""
+        return list(self.load().keys())
+
+    def dates_between(self, start=None, end=None, after=None, limit=None):
+        """Return sorted dates in [start, end] after a cursor date, at most limit of them"""
+        with self._lock:
+            self._refresh()
+            return self.date_index.between(start, end, after, limit)
+
+    def get_range(self, start, end):
+        """Return {date: entries} for all dates in [start, end], oldest first"""
+        with self._lock:
+            self._refresh()
+            return {date: self._data[date] for date in self.date_index.between(start, end)}
+
+    def last_cycle_entry(self):
+        """Return (date, cycle_day) for the most recent date whose latest entry has a cycle day"""
+        with self._lock:
+            self._refresh()
+            return self.cycle_index.latest()
+
+    def last_cycle_day(self):
+        """Return the cycle day of the most recent date that has one"""
+        latest = self.last_cycle_entry()
+        return latest[1] if latest else None
+
+    def stats(self):
+        """Return cache counters for monitoring"""
+        return {
+            'hits': self.hits,
+            'reloads': self.reloads
+        }
+
+
+class JournalStore(SymptomStore):
+    """Symptom store that appends single-date updates to a write-ahead log
+
+    The JSON snapshot keeps the usual format; the journal holds one compact
+    JSON line per save: ["YYYY-MM-DD", [entries]]. Reads replay the journal
+    on top of the snapshot and compaction folds it back into the snapshot.
+    """
+
+    def __init__(self, path, compact_threshold=500):
+        self.journal_path = path + '.journal'
+        self.compact_threshold = compact_threshold
+        self._journal_lines = 0
+        super().__init__(path)
+
+        # Counters for monitoring the journal
+        self.appends = 0
+        self.compactions = 0
+
+    def _stat_signature(self):
+        """Return a tuple identifying the snapshot and journal versions"""
+        snapshot = super()._stat_signature()
+        journal = file_signature(self.journal_path)
+        if snapshot is None and journal is None:
+            return None
+        return (snapshot, journal)
+
+    def _read(self):
+        """Load the snapshot and replay the journal on top of it"""
+        data = super()._read()
+        self._journal_lines = 0
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        date, entries = json.loads(line)
+                    except (ValueError, TypeError):
+                        # Torn write from an interrupted append, ignore it
+                        continue
+                    data[date] = entries
+                    self._journal_lines += 1
+        except FileNotFoundError:
+            pass
+        return data
+
+    def save(self, data):
+        """Write a full snapshot and discard the journal"""
+        with self._write_lock():
+            atomic_write_json(self.path, data, indent=2)
+            with open(self.journal_path, 'w', encoding='utf-8'):
+                pass
+            self._replace_data(data)
+            self._journal_lines = 0
+            self._signature = self._stat_signature()
+
+    def _append(self, text):
+        """Append journal lines with a single write and fsync; return the bytes written
+
+        A crash during an earlier append can leave a torn last line without
+        its newline. It is cut off first, otherwise the new lines would be
+        glued onto it and dropped as unparsable when the journal is read.
+        Callers hold the write lock.
+        """
+        data = text.encode('utf-8')
+        with open(self.journal_path, 'a+b') as f:
+            end = f.seek(0, os.SEEK_END)
+            if end:
+                f.seek(end - 1)
+                if f.read(1) != b'\n':
+                    f.truncate(_last_line_end(f, end))
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        return len(data)
+
+    def put(self, date, entries):
+        """Append a single-date update to the journal"""
+        check_entries(date, entries)
+        with self._write_lock():
+            self._refresh()
+            with JSON_SAVE_DURATION.time():
+                line = json.dumps([date, entries], separators=(',', ':')) + '\n'
+                written = self._append(line)
+            BYTES_WRITTEN.inc(written)
+            self._apply(date, self._data.get(date), entries)
+            self._journal_lines += 1
+            self._signature = self._stat_signature()
+            self.appends += 1
+
+            if self._journal_lines >= self.compact_threshold:
+                self.compact()
+
+    def put_many(self, updates):
+        """Append several single-date updates to the journal with one write and fsync"""
+        for date, entries in updates.items():
+            check_entries(date, entries)
+        with self._write_lock():
+            self._refresh()
+            with JSON_SAVE_DURATION.time():
+                lines = ''.join(json.dumps([date, entries], separators=(',', ':')) + '\n'
+                                for date, entries in updates.items())
+                written = self._append(lines)
+            BYTES_WRITTEN.inc(written)
+            for date, entries in updates.items():
+                self._apply(date, self._data.get(date), entries)
+            self._journal_lines += len(updates)
+            self._signature = self._stat_signature()
+            self.appends += len(updates)
+
+            if self._journal_lines >= self.compact_threshold:
+                self.compact()
+
+    def compact(self):
+        """Fold the journal back into the JSON snapshot"""
+        with self._write_lock():
+            self._refresh()
+            self.save(self._data)
+            self.compactions += 1
+
+    def stats(self):
+        """Return cache and journal counters for monitoring"""
+        stats = super().stats()
+        stats.update({
+            'journal_lines': self._journal_lines,
+            'appends': self.appends,
+            'compactions': self.compactions
+        })
+        return stats
+
+
+class SqliteStore(SymptomStore):
+    """Symptom store backed by an SQLite database
+
+    Dates, entries and symptoms are normalized into separate tables so
+    single-date lookups, the date list and the last cycle day are answered
+    with indexed queries. load() still returns the full dict for the
+    dashboard and is cached like the JSON store.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS days (
+            date TEXT PRIMARY KEY
+        );
+        CREATE TABLE IF NOT EXISTS entries (
+            id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL REFERENCES days(date),
+            position INTEGER NOT NULL,
+            datetime TEXT,
+            cycle_day INTEGER,
+            comment TEXT,
+            extra TEXT
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_date ON entries(date, position);
+        CREATE TABLE IF NOT EXISTS symptoms (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS entry_symptoms (
+            entry_id INTEGER NOT NULL REFERENCES entries(id),
+            position INTEGER NOT NULL,
+            symptom_id INTEGER NOT NULL REFERENCES symptoms(id),
+            PRIMARY KEY (entry_id, position)
+        );
+        CREATE INDEX IF NOT EXISTS idx_entry_symptoms_symptom ON entry_symptoms(symptom_id);
+    """
+
+    # Entry keys that map onto columns; anything else is kept in 'extra'
+    ENTRY_COLUMNS = ('datetime', 'symptoms', 'cycleDay', 'comment')
+
+    # get(), dates() and ranges query the database and would miss staged dates
+    supports_staging = False
+
+    def __init__(self, path):
+        super().__init__(path)
+        # SQLite does its own inter-process locking, wait for other workers' writes
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+
+    def _stat_signature(self):
+        """Return a tuple identifying the database and its WAL file"""
+        return (file_signature(self.path), file_signature(self.path + '-wal'))
+
+    def _load_entries(self, where='', params=()):
+        """Return (date, entry) pairs for the entries matching a WHERE clause, in log order
+
+        where filters the entries table (aliased e), e.g. 'WHERE e.date = ?'.
+        The symptoms are fetched with a join on the same filter, so the
+        number of SQL variables does not grow with the number of entries.
+        """
+        entries = {}
+        rows = self._conn.execute(
+            f"""SELECT e.id, e.date, e.datetime, e.cycle_day, e.comment, e.extra FROM entries e
+                {where} ORDER BY e.date, e.position""",
+            params
+        )
+        for entry_id, date, datetime_str, cycle_day, comment, extra in rows:
+            entry = {}
+            if datetime_str is not None:
+                entry['datetime'] = datetime_str
+            entry['symptoms'] = []
+            if cycle_day is not None:
+                entry['cycleDay'] = cycle_day
+            if comment is not None:
+                entry['comment'] = comment
+            if extra:
+                entry.update(json.loads(extra))
+            entries[entry_id] = (date, entry)
+
+        if entries:
+            symptom_rows = self._conn.execute(
+                f"""SELECT es.entry_id, s.name FROM entry_symptoms es
+                    JOIN entries e ON e.id = es.entry_id
+                    JOIN symptoms s ON s.id = es.symptom_id
+                    {where} ORDER BY es.entry_id, es.position""",
+                params
+            )
+            for entry_id, name in symptom_rows:
+                entries[entry_id][1]['symptoms'].append(name)
+        return entries.values()
+
+    def _read(self):
+        """Rebuild the full symptom log from the database"""
+        data = {date: [] for (date,) in self._conn.execute("SELECT date FROM days ORDER BY date")}
+        for date, entry in self._load_entries():
+            data[date].append(entry)
+        return data
+
+    def _symptom_id(self, name):
+        """Return the id of a symptom name, inserting it if needed"""
+        self._conn.execute("INSERT OR IGNORE INTO symptoms (name) VALUES (?)", (name,))
+        return self._conn.execute("SELECT id FROM symptoms WHERE name = ?", (name,)).fetchone()[0]
+
+    def _write_date(self, date, entries):
+        """Replace the rows for a single date (caller handles the transaction)"""
+        self._conn.execute(
+            "DELETE FROM entry_symptoms WHERE entry_id IN (SELECT id FROM entries WHERE date = ?)",
+            (date,)
+        )
+        self._conn.execute("DELETE FROM entries WHERE date = ?", (date,))
+        self._conn.execute("INSERT OR IGNORE INTO days (date) VALUES (?)", (date,))
+
+        for position, entry in enumerate(entries):
+            extra = {k: v for k, v in entry.items() if k not in self.ENTRY_COLUMNS}
+            cursor = self._conn.execute(
+                """INSERT INTO entries (date, position, datetime, cycle_day, comment, extra)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (date, position, entry.get('datetime'), entry.get('cycleDay'),
+                 entry.get('comment'), json.dumps(extra) if extra else None)
+            )
+            for symptom_position, name in enumerate(entry.get('symptoms', [])):
+                self._conn.execute(
+                    "INSERT INTO entry_symptoms (entry_id, position, symptom_id) VALUES (?, ?, ?)",
+                    (cursor.lastrowid, symptom_position, self._symptom_id(name))
+                )
+
+    def _replace_all(self, pairs):
+        """Replace every row with (date, entries) pairs in one transaction; return the date count"""
+        count = 0
+        with JSON_SAVE_DURATION.time(), self._conn:
+            self._conn.execute("DELETE FROM entry_symptoms")
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM days")
+            for date, entries in pairs:
+                self._write_date(date, entries)
+                count += 1
+        return count
+
+    def save(self, data):
+        """Replace the whole database with the given symptom log"""
+        with self._write_lock():
+            self._replace_all(data.items())
+            self._replace_data(data)
+            self._signature = self._stat_signature()
+
+    def save_stream(self, pairs):
+        """Replace the whole database with (date, entries) pairs, e.g. from iter_symptom_file()
+
+        The pairs are written as they arrive, so the log is never held in
+        memory; the cache is reloaded on the next read. Returns the number
+        of dates written.
+        """
+        with self._write_lock():
+            return self._replace_all(pairs)
+
+    def put(self, date, entries):
+        """Replace the entries stored for a single date"""
+        check_entries(date, entries)
+        with self._write_lock():
+            cache_current = self._signature == self._stat_signature()
+            with JSON_SAVE_DURATION.time(), self._conn:
+                self._write_date(date, entries)
+
+            # Keep the cached dict in sync if it was up to date before the write
+            if cache_current:
+                self._apply(date, self._data.get(date), entries)
+                self._signature = self._stat_signature()
+
+    def put_many(self, updates):
+        """Replace the entries of several dates ({date: entries}) in one transaction"""
+        for date, entries in updates.items():
+            check_entries(date, entries)
+        with self._write_lock():
+            cache_current = self._signature == self._stat_signature()
+            with JSON_SAVE_DURATION.time(), self._conn:
+                for date, entries in updates.items():
+                    self._write_date(date, entries)
+
+            if cache_current:
+                for date, entries in updates.items():
+                    self._apply(date, self._data.get(date), entries)
+                self._signature = self._stat_signature()
+
+    def get(self, date):
+        """Return the entries logged for a date using the date index"""
+        with self._lock:
+            return [entry for _, entry in self._load_entries('WHERE e.date = ?', (date,))]
+
+    def dates(self):
+        """Return all dates that have an entry, oldest first"""
+        with self._lock:
+            return [date for (date,) in self._conn.execute("SELECT date FROM days ORDER BY date")]
+
+    def dates_between(self, start=None, end=None, after=None, limit=None):
+        """Return sorted dates in [start, end] after a cursor date using the primary key index"""
+        conditions = []
+        params = []
+        for condition, value in (('date >= ?', start), ('date <= ?', end), ('date > ?', after)):
+            if value:
+                conditions.append(condition)
+                params.append(value)
+        query = "SELECT date FROM days"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY date"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [date for (date,) in self._conn.execute(query, params)]
+
+    def get_range(self, start, end):
+        """Return {date: entries} for all dates in [start, end], oldest first"""
+        with self._lock:
+            data = {date: [] for date in self.dates_between(start, end)}
+            for date, entry in self._load_entries('WHERE e.date >= ? AND e.date <= ?', (start, end)):
+                data[date].append(entry)
+            return data
+
+    def last_cycle_entry(self):
+        """Return (date, cycle_day) of the latest entry of the most recent date that has one"""
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT e.date, e.cycle_day FROM entries e
+                   WHERE e.position = (SELECT MAX(position) FROM entries WHERE date = e.date)
+                     AND e.cycle_day IS NOT NULL
+                   ORDER BY e.date DESC LIMIT 1"""
+            ).fetchone()
+            return tuple(row) if row else None
+
+
+STORE_BACKENDS = {
+    'json': SymptomStore,
+    'journal': JournalStore,
+    'sqlite': SqliteStore
+}
+
+
+def open_store(path, backend='json'):
+    """Create a store for the given path using the named backend"""
+    try:
+        store_class = STORE_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown storage backend: {backend}")
+    return store_class(path)
+
+
+def migrate_json_to_sqlite(json_path, db_path):
+    """Copy an existing JSON symptom log into an SQLite database, streaming it one date at a time"""
+    return SqliteStore(db_path).save_stream(iter_symptom_file(json_path))
+
+
+def main():
+    """Command line entry point for storage maintenance"""
+    if len(sys.argv) != 4 or sys.argv[1] != 'migrate':
+        print("Usage: python symptom_store.py migrate <symptom_log.json> <symptom_log.db>")
+        sys.exit(1)
+
+    count = migrate_json_to_sqlite(sys.argv[2], sys.argv[3])
+    print(f"✅ Migrated {count} dates from {sys.argv[2]} to {sys.argv[3]}")
+
+
+if __name__ == "__main__":
+    main()
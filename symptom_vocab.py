@@ -0,0 +1,122 @@
+#!/usr/bin/python3.10
+
+"""
+Symptom vocabulary for Symptom Tracker
+Parses 'Base: type' symptom strings once into records with integer ids,
+so the analytics hot loops work on ids and dict lookups instead of
+re-splitting and lowercasing strings for every day.
+
+Every shard owns a vocabulary, so it only holds that user's symptoms and
+is dropped when the shard is evicted; one-off computations use their own.
+"""
+
+import threading
+
+
+class SymptomRecord:
+    """A parsed symptom string: 'Sport: Zwemmen' -> base 'Sport', type 'Zwemmen'"""
+
+    __slots__ = ('id', 'raw', 'base_id', 'type_id')
+
+    def __init__(self, record_id, raw, base_id, type_id):
+        self.id = record_id
+        self.raw = raw
+        self.base_id = base_id
+        self.type_id = type_id
+
+
+class SymptomVocabulary:
+    """Table from symptom strings to SymptomRecord instances
+
+    - records: raw string -> record
+    - bases / types: id -> name, 'general' is the type of symptoms without one
+    - lower: record id -> lowercase raw string for case-insensitive search
+    - type_payloads: type id -> shared {'type': name} dict for timelines
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records = {}
+        self.by_id = []
+        self.lower = []
+        self.bases = []
+        self.base_ids = {}
+        self.types = []
+        self.type_ids = {}
+        self.type_payloads = []
+
+    def _add_name(self, table, names, name):
+        """Return the id of name in a name table, adding it if needed"""
+        name_id = table.get(name)
+        if name_id is None:
+            name_id = table[name] = len(names)
+            names.append(name)
+        return name_id
+
+    def record(self, raw):
+        """Return the record for a symptom string, parsing it on first sight"""
+        record = self.records.get(raw)
+        if record is not None:
+            return record
+
+        with self._lock:
+            record = self.records.get(raw)
+            if record is not None:
+                return record
+
+            base_symptom, symptom_type = split_symptom(raw)
+            base_id = self._add_name(self.base_ids, self.bases, base_symptom)
+            type_count = len(self.types)
+            type_id = self._add_name(self.type_ids, self.types, symptom_type)
+            if type_id == type_count:
+                self.type_payloads.append({'type': self.types[type_id]})
+
+            record = SymptomRecord(len(self.by_id), raw, base_id, type_id)
+            self.by_id.append(record)
+            self.lower.append(raw.lower())
+            self.records[record.raw] = record
+            return record
+
+    def matches(self, record, needle):
+        """Case-insensitive substring test of an already lowercased needle"""
+        return needle in self.lower[record.id]
+
+
+def split_symptom(raw):
+    """Split 'Base: type' into (base, type); symptoms without a type get 'general'"""
+    if ':' in raw:
+        base_symptom, symptom_type = raw.split(':', 1)
+        return base_symptom.strip(), symptom_type.strip()
+    return raw, 'general'
+
+
+def normalize_symptom(raw):
+    """Return the canonical form of a submitted symptom string
+
+    Surrounding whitespace is dropped and typed symptoms are written as
+    'Base: type', the form index.html produces.
+    """
+    raw = raw.strip()
+    if ':' in raw:
+        base_symptom, symptom_type = split_symptom(raw)
+        raw = f"{base_symptom}: {symptom_type}"
+    return raw
+
+
+def normalize_symptoms(symptoms):
+    """Normalize a list of submitted symptom strings, dropping empty ones"""
+    return [normalize_symptom(symptom) for symptom in symptoms if isinstance(symptom, str) and symptom.strip()]
+
+
+def share_symptom_strings(entries, strings):
+    """Make equal symptom strings of loaded entries share one object, in place
+
+    strings maps each string seen so far to its shared copy; pass the same
+    dict for every date of one load.
+    """
+    if isinstance(entries, list):
+        for entry in entries:
+            symptoms = entry.get('symptoms') if isinstance(entry, dict) else None
+            if isinstance(symptoms, list):
+                entry['symptoms'] = [strings.setdefault(s, s) if isinstance(s, str) else s for s in symptoms]
+    return entries
@@ -3,27 +3,457 @@
 Automatic sync script for PythonAnywhere deployment
 This script will automatically upload your files to PythonAnywhere when you make changes
 
+Only changed files are sent. One remote command returns the size and
+SHA-256 of every synced file; files that only grew (like the storage
+journal) get just their new bytes appended, data files get a compressed
+diff against the copy uploaded last time (kept in .sync_cache/), and
+everything else that changed is uploaded whole. All appends and diffs go
+in a single remote command and all directories are created in another.
+
+Whole files are uploaded in parallel over several SFTP channels of the
+same SSH connection. Each goes to <file>.part and is renamed into place
+when complete; an interrupted upload resumes from the end of its .part
+file, in the same run or the next one, as long as the local file has
+not changed since.
+
 Requirements:
-1. Install: pip install paramiko scp
+1. Install: pip install paramiko
 2. Set up your PythonAnywhere credentials
 3. Run this script after making changes
 
 Usage:
     python sync_to_pythonanywhere.py
+    python sync_to_pythonanywhere.py --dry-run           # show what would be sent
+    python sync_to_pythonanywhere.py --local /tmp/mysite  # sync into a local directory (testing)
 """
 
 import os
+import argparse
+import difflib
+import hashlib
 import json
-import paramiko
-from scp import SCPClient
+import shlex
+import subprocess
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 import getpass
 
+try:
+    import paramiko
+except ImportError:  # only needed for real syncs, not for --local
+    paramiko = None
+
+CACHE_DIR = '.sync_cache'
+MANIFEST_FILE = os.path.join(CACHE_DIR, 'manifest.json')
+# {file: sha256} of whole-file uploads that have not completed yet
+PARTIAL_FILE = os.path.join(CACHE_DIR, 'partial.json')
+
+# Files synced with compressed diffs against their last uploaded copy
+DEFAULT_DATA_FILES = [
+    'data/symptom_log.json',
+    'data/symptom_log.json.journal'
+]
+
+# Bytes compared at a time when trimming the unchanged start and end of a data file
+PATCH_BLOCK_BYTES = 4096
+# Cut a diff chunk after about one line in 32
+PATCH_CHUNK_MASK = 31
+
+# Parallel whole-file uploads: SFTP channels on the one SSH connection
+UPLOAD_CHANNELS = 4
+# Bytes written per SFTP write call (paramiko splits and pipelines them)
+UPLOAD_BLOCK_BYTES = 256 * 1024
+# SSH flow-control window per channel, large enough not to stall on latency
+SFTP_WINDOW_BYTES = 8 * 1024 * 1024
+# Attempts per file; each retry resumes from what already arrived
+UPLOAD_ATTEMPTS = 3
+# Seconds between progress lines of one file
+PROGRESS_INTERVAL = 2.0
+
+# Errors after which an upload is retried
+TRANSFER_ERRORS = (OSError, EOFError) + ((paramiko.SSHException,) if paramiko is not None else ())
+
+# Prints {path: [size, sha256] or null} for the paths given as arguments
+REMOTE_HASH_SCRIPT = '''
+import hashlib, json, sys
+result = {}
+for path in sys.argv[1:]:
+    try:
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+                size += len(block)
+        result[path] = [size, digest.hexdigest()]
+    except OSError:
+        result[path] = None
+print(json.dumps(result))
+'''
+
+# Reads a JSON list of operations and their zlib payloads from stdin and
+# prints {path: 'ok' or the reason it was not applied}
+REMOTE_APPLY_SCRIPT = '''
+import hashlib, json, os, sys, zlib
+stdin = sys.stdin.buffer
+status = {}
+for op in json.loads(stdin.readline()):
+    payload = zlib.decompress(stdin.read(op['length']))
+    path = op['path']
+    try:
+        with open(path, 'rb') as f:
+            base = f.read()
+    except OSError:
+        status[path] = 'missing'
+        continue
+    if hashlib.sha256(base).hexdigest() != op['base']:
+        status[path] = 'changed remotely'
+        continue
+    if op['op'] == 'append':
+        new = base + payload
+    else:
+        parts = []
+        position = offset = 0
+        for start, end, length in op['edits']:
+            parts.append(base[position:start])
+            parts.append(payload[offset:offset + length])
+            position = end
+            offset += length
+        parts.append(base[position:])
+        new = b''.join(parts)
+    if hashlib.sha256(new).hexdigest() != op['result']:
+        status[path] = 'result mismatch'
+        continue
+    if op['op'] == 'append':
+        with open(path, 'ab') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+    else:
+        tmp_path = path + '.sync-tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(new)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        os.replace(tmp_path, path)
+    status[path] = 'ok'
+print(json.dumps(status))
+'''
+
+
+def sha256_hex(data):
+    """Return the SHA-256 hex digest of bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def format_bytes(count):
+    """Return a byte count as a short human-readable string"""
+    for unit in ('B', 'KB', 'MB'):
+        if count < 1024:
+            return f"{count:.0f} {unit}" if unit == 'B' else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+
+def _common_ends(base, new):
+    """Return the lengths of the common prefix and (non-overlapping) common suffix"""
+    limit = min(len(base), len(new))
+    block = PATCH_BLOCK_BYTES
+    # Skip equal blocks with slice comparisons, then go byte by byte
+    prefix = 0
+    while prefix + block <= limit and base[prefix:prefix + block] == new[prefix:prefix + block]:
+        prefix += block
+    while prefix < limit and base[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while (suffix + block <= limit - prefix
+           and base[len(base) - suffix - block:len(base) - suffix] == new[len(new) - suffix - block:len(new) - suffix]):
+        suffix += block
+    while suffix < limit - prefix and base[len(base) - 1 - suffix] == new[len(new) - 1 - suffix]:
+        suffix += 1
+    return prefix, suffix
+
+
+def _chunks(data):
+    """Split bytes into runs of lines, cut after lines whose CRC matches PATCH_CHUNK_MASK
+
+    The cut points depend only on the content, so an edit does not shift
+    the chunks after it and unchanged chunks match up in the diff.
+    """
+    chunks = []
+    start = 0
+    position = 0
+    while position < len(data):
+        end = data.find(b'\n', position)
+        end = len(data) if end < 0 else end + 1
+        if zlib.crc32(data[position:end]) & PATCH_CHUNK_MASK == 0 or end == len(data):
+            chunks.append(data[start:end])
+            start = end
+        position = end
+    return chunks
+
+
+def make_patch(base, new):
+    """Return edits [(start, end, data)] that turn base into new
+
+    Each edit replaces base[start:end] with data; edits are sorted and do
+    not overlap. The common prefix and suffix are trimmed first, and the
+    rest is diffed as content-defined chunks of lines, so a few edited or
+    added dates in the symptom log produce a few small edits.
+    """
+    prefix, suffix = _common_ends(base, new)
+    old_chunks = _chunks(base[prefix:len(base) - suffix])
+    new_chunks = _chunks(new[prefix:len(new) - suffix])
+    offsets = [prefix]
+    for chunk in old_chunks:
+        offsets.append(offsets[-1] + len(chunk))
+
+    matcher = difflib.SequenceMatcher(None, old_chunks, new_chunks, autojunk=False)
+    return [(offsets[i1], offsets[i2], b''.join(new_chunks[j1:j2]))
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal']
+
+
+class SSHTransport:
+    """Runs commands and uploads files on PythonAnywhere over one SSH connection
+
+    Commands and every SFTP channel share the connection; channels are
+    opened on demand and handed back to a pool for reuse. If the
+    connection drops, the next command or channel reconnects.
+    """
+
+    def __init__(self, hostname, username, password):
+        if paramiko is None:
+            raise RuntimeError("paramiko is required: pip install paramiko")
+        self.hostname = hostname
+        self.username = username
+        self.password = password
+        self.ssh = None
+        self._channels = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _connect(self):
+        """(Re)open the SSH connection"""
+        if self.ssh is not None:
+            self.ssh.close()
+        self.ssh = paramiko.SSHClient()
+        self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self.ssh.connect(hostname=self.hostname, username=self.username, password=self.password, port=22)
+
+    def _transport(self):
+        """Return the active paramiko transport, reconnecting if the connection dropped"""
+        with self._lock:
+            transport = self.ssh.get_transport()
+            if transport is None or not transport.is_active():
+                self._connect()
+                transport = self.ssh.get_transport()
+            return transport
+
+    def run(self, command, stdin_data=b''):
+        """Run a shell command and return (exit status, stdout bytes, stderr bytes)"""
+        self._transport()
+        stdin, stdout, stderr = self.ssh.exec_command(command)
+        if stdin_data:
+            stdin.write(stdin_data)
+        stdin.channel.shutdown_write()
+        output = stdout.read()
+        errors = stderr.read()
+        return stdout.channel.recv_exit_status(), output, errors
+
+    @contextmanager
+    def channel(self):
+        """Borrow an SFTP channel; it goes back to the pool unless it failed"""
+        try:
+            sftp = self._channels.get_nowait()
+            if not sftp.get_channel().get_transport().is_active():
+                sftp = None
+        except queue.Empty:
+            sftp = None
+        if sftp is None:
+            sftp = paramiko.SFTPClient.from_transport(self._transport(), window_size=SFTP_WINDOW_BYTES)
+        try:
+            yield sftp
+        except BaseException:
+            sftp.close()
+            raise
+        self._channels.put(sftp)
+
+    def close(self):
+        """Close the pooled channels and the connection"""
+        while True:
+            try:
+                self._channels.get_nowait().close()
+            except queue.Empty:
+                break
+        self.ssh.close()
+
+
+class LocalChannel:
+    """The subset of paramiko's SFTPClient used for uploads, on local files"""
+
+    def stat(self, path):
+        return os.stat(path)
+
+    def open(self, path, mode):
+        return open(path, mode)
+
+    def posix_rename(self, old_path, new_path):
+        os.replace(old_path, new_path)
+
+
+class LocalTransport:
+    """Stand-in for SSHTransport that runs the same commands on this machine
+
+    Used by --local to test the sync protocol against a local directory.
+    """
+
+    def run(self, command, stdin_data=b''):
+        """Run a shell command and return (exit status, stdout bytes, stderr bytes)"""
+        result = subprocess.run(command, shell=True, input=stdin_data, capture_output=True)
+        return result.returncode, result.stdout, result.stderr
+
+    @contextmanager
+    def channel(self):
+        """Return a channel on the local filesystem"""
+        yield LocalChannel()
+
+    def close(self):
+        """Nothing to close"""
+
+
+class Uploader:
+    """Uploads whole files in parallel, resumably, with per-file progress
+
+    Each file is written to <remote>.part over a channel borrowed from the
+    transport and renamed over <remote> once complete. PARTIAL_FILE
+    records the SHA-256 of every upload in flight: a later attempt at the
+    same content continues from the size of the .part file, while a
+    changed file starts over.
+    """
+
+    def __init__(self, transport, channels=UPLOAD_CHANNELS):
+        self.transport = transport
+        self.channels = channels
+        self._print_lock = threading.Lock()
+
+    def say(self, message):
+        """Print one line without interleaving with other upload threads"""
+        with self._print_lock:
+            print(message, flush=True)
+
+    def upload_all(self, items):
+        """Upload items (file, remote, content, sha256); return the items that failed"""
+        if not items:
+            return []
+        partial = load_partial()
+        resumable = {item['file'] for item in items if partial.get(item['file']) == item['sha256']}
+        partial.update({item['file']: item['sha256'] for item in items})
+        save_partial(partial)
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.channels, thread_name_prefix='upload') as executor:
+            results = list(executor.map(lambda item: self.upload(item, item['file'] in resumable), items))
+        elapsed = time.monotonic() - started
+
+        failed = [item for item, sent in zip(items, results) if sent is None]
+        for item, sent in zip(items, results):
+            if sent is not None:
+                partial.pop(item['file'], None)
+        save_partial(partial)
+
+        sent = sum(result for result in results if result)
+        self.say(f"📊 Uploaded {len(items) - len(failed)} of {len(items)} files, {format_bytes(sent)} "
+                 f"in {elapsed:.1f}s ({format_bytes(sent / max(elapsed, 1e-6))}/s, {self.channels} channels)")
+        return failed
+
+    def upload(self, item, resumable):
+        """Upload one file with retries; return the bytes sent, or None if it failed"""
+        sent = 0
+        for attempt in range(1, UPLOAD_ATTEMPTS + 1):
+            try:
+                with self.transport.channel() as channel:
+                    sent += self._send(channel, item, resumable or attempt > 1)
+                return sent
+            except TRANSFER_ERRORS as e:
+                if attempt == UPLOAD_ATTEMPTS:
+                    self.say(f"❌ {item['file']} failed after {attempt} attempts: {e}")
+                    return None
+                self.say(f"⚠️  {item['file']}: {e}, retrying ({attempt}/{UPLOAD_ATTEMPTS - 1})")
+                time.sleep(attempt)
+
+    def _send(self, channel, item, resume):
+        """Write the rest of a file to its .part file, rename it into place and return the bytes sent"""
+        content = item['content']
+        part_path = item['remote'] + '.part'
+        offset = 0
+        if resume:
+            try:
+                offset = channel.stat(part_path).st_size
+            except FileNotFoundError:
+                offset = 0
+            if offset > len(content):
+                offset = 0
+
+        total = len(content) - offset
+        if offset:
+            self.say(f"📤 Resuming {item['file']} at {format_bytes(offset)} of {format_bytes(len(content))}")
+        else:
+            self.say(f"📤 Uploading {item['file']} ({format_bytes(len(content))})")
+
+        started = last_report = time.monotonic()
+        position = offset
+        with channel.open(part_path, 'r+b' if offset else 'wb') as f:
+            if offset:
+                f.seek(offset)
+            if hasattr(f, 'set_pipelined'):
+                # Don't wait for each write to be acknowledged
+                f.set_pipelined(True)
+            while position < len(content):
+                block = content[position:position + UPLOAD_BLOCK_BYTES]
+                f.write(block)
+                position += len(block)
+                now = time.monotonic()
+                if now - last_report >= PROGRESS_INTERVAL and position < len(content):
+                    last_report = now
+                    rate = (position - offset) / (now - started)
+                    self.say(f"   {item['file']}: {position * 100 // len(content)}% "
+                             f"({format_bytes(position)}, {format_bytes(rate)}/s)")
+        channel.posix_rename(part_path, item['remote'])
+
+        elapsed = time.monotonic() - started
+        resumed = f", resumed at {format_bytes(offset)}" if offset else ""
+        self.say(f"✅ {item['file']} uploaded ({format_bytes(total)} in {elapsed:.2f}s, "
+                 f"{format_bytes(total / max(elapsed, 1e-6))}/s{resumed})")
+        return total
+
+
+def load_partial():
+    """Return {file: sha256} of uploads that did not complete"""
+    try:
+        with open(PARTIAL_FILE, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_partial(partial):
+    """Write the record of uploads in flight"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(PARTIAL_FILE, 'w') as f:
+        json.dump(partial, f, indent=2)
+
+
 class PythonAnywhereSync:
     def __init__(self):
         self.config_file = 'pythonanywhere_config.json'
         self.config = self.load_config()
-        
+
     def load_config(self):
         """Load or create configuration"""
         if os.path.exists(self.config_file):
@@ -31,12 +461,12 @@ class PythonAnywhereSync:
                 return json.load(f)
         else:
             return self.create_config()
-    
+
     def create_config(self):
         """Create initial configuration"""
         print("🔧 Setting up PythonAnywhere sync configuration...")
         print("You can find these details in your PythonAnywhere account settings.")
-        
+
         config = {
             'username': input('PythonAnywhere username: '),
             'hostname': '',  # Will be set automatically
@@ -45,98 +475,223 @@ class PythonAnywhereSync:
                 'flask_app.py',
                 'templates/index.html',
                 'data/symptom_log.json'
-            ]
+            ],
+            'data_files': list(DEFAULT_DATA_FILES)
         }
-        
+
         # Set derived values
         config['hostname'] = f"{config['username']}.pythonanywhere.com"
         config['remote_path'] = f"/home/{config['username']}/mysite"
-        
+
         # Save config (without password for security)
         with open(self.config_file, 'w') as f:
             json.dump(config, f, indent=2)
-            
+
         print(f"✅ Configuration saved to {self.config_file}")
         print(f"📡 Will sync to: {config['hostname']}:{config['remote_path']}")
-        
+
         return config
-    
+
     def get_password(self):
         """Securely get password"""
         return getpass.getpass(f"Password for {self.config['username']}: ")
-    
-    def sync_files(self):
-        """Sync files to PythonAnywhere"""
+
+    def load_manifest(self):
+        """Return {file: {'size', 'sha256', 'synced_at'}} as uploaded by the last sync"""
+        try:
+            with open(MANIFEST_FILE, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_manifest(self, manifest):
+        """Write the manifest of the last sync"""
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(MANIFEST_FILE, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    def remote_hashes(self, transport, remote_files):
+        """Return {remote path: (size, sha256) or None} with a single remote command"""
+        command = 'python3 -c ' + shlex.quote(REMOTE_HASH_SCRIPT) + ' ' + ' '.join(shlex.quote(p) for p in remote_files)
+        status, output, errors = transport.run(command)
+        if status != 0:
+            raise RuntimeError(f"Remote hashing failed: {errors.decode('utf-8', 'replace').strip()}")
+        return {path: tuple(value) if value else None for path, value in json.loads(output).items()}
+
+    def plan(self, transport, manifest):
+        """Compare local files with the remote ones and decide how to send each
+
+        Returns a list of dicts with file, remote, action ('unchanged',
+        'append', 'patch' or 'upload'), content, bytes (sent) and, for
+        append/patch, the remote operation.
+        """
+        data_files = set(self.config.get('data_files', DEFAULT_DATA_FILES))
+        files = []
+        for file_path in self.config['files_to_sync']:
+            if os.path.exists(file_path):
+                files.append(file_path)
+            else:
+                print(f"⚠️  {file_path} not found, skipping")
+        remote_files = {file_path: f"{self.config['remote_path']}/{file_path}" for file_path in files}
+        remote = self.remote_hashes(transport, list(remote_files.values())) if files else {}
+
+        plan = []
+        for file_path in files:
+            with open(file_path, 'rb') as f:
+                content = f.read()
+            remote_file = remote_files[file_path]
+            item = {'file': file_path, 'remote': remote_file, 'content': content,
+                    'sha256': sha256_hex(content), 'action': 'upload', 'bytes': len(content)}
+            plan.append(item)
+
+            existing = remote.get(remote_file)
+            if existing is None:
+                continue
+            remote_size, remote_sha = existing
+            if remote_sha == item['sha256']:
+                item['action'] = 'unchanged'
+                item['bytes'] = 0
+                continue
+
+            if len(content) > remote_size and sha256_hex(content[:remote_size]) == remote_sha:
+                payload = zlib.compress(content[remote_size:], 6)
+                item['op'] = {'op': 'append', 'path': remote_file, 'base': remote_sha, 'result': item['sha256']}
+            elif file_path in data_files and manifest.get(file_path, {}).get('sha256') == remote_sha:
+                base = self.cached_copy(file_path, remote_sha)
+                if base is None:
+                    continue
+                edits = make_patch(base, content)
+                payload = zlib.compress(b''.join(data for _, _, data in edits), 6)
+                item['op'] = {'op': 'patch', 'path': remote_file, 'base': remote_sha, 'result': item['sha256'],
+                              'edits': [[start, end, len(data)] for start, end, data in edits]}
+            else:
+                continue
+
+            if len(payload) < len(content):
+                item['op']['length'] = len(payload)
+                item['payload'] = payload
+                item['action'] = item['op']['op']
+                item['bytes'] = len(payload)
+            else:
+                del item['op']
+        return plan
+
+    def cached_copy(self, file_path, sha256):
+        """Return the last uploaded copy of a data file if it still has the given hash"""
+        try:
+            with open(os.path.join(CACHE_DIR, file_path), 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        return content if sha256_hex(content) == sha256 else None
+
+    def apply_deltas(self, transport, items):
+        """Send all appends and patches in one remote command; return the items that failed"""
+        if not items:
+            return []
+        header = json.dumps([item['op'] for item in items]).encode('utf-8') + b'\n'
+        stdin_data = header + b''.join(item['payload'] for item in items)
+        status, output, errors = transport.run('python3 -c ' + shlex.quote(REMOTE_APPLY_SCRIPT), stdin_data)
+        if status != 0:
+            print(f"⚠️  Remote apply failed, uploading whole files: {errors.decode('utf-8', 'replace').strip()}")
+            return items
+        results = json.loads(output)
+        failed = []
+        for item in items:
+            result = results.get(item['remote'])
+            if result == 'ok':
+                print(f"✅ {item['file']} {item['action']}ed ({item['bytes']} bytes sent)")
+            else:
+                print(f"⚠️  {item['file']} could not be {item['action']}ed ({result}), uploading it whole")
+                failed.append(item)
+        return failed
+
+    def connect(self, local_root=None):
+        """Return the transport: SSH to PythonAnywhere, or a local stand-in for --local"""
+        if local_root is not None:
+            self.config['remote_path'] = os.path.abspath(local_root)
+            print(f"🧪 Syncing into local directory {self.config['remote_path']}")
+            return LocalTransport()
+
+        # Get password
+        password = self.get_password()
+        transport = SSHTransport('ssh.pythonanywhere.com', self.config['username'], password)
+        print("✅ Connected to PythonAnywhere")
+        return transport
+
+    def sync_files(self, dry_run=False, local_root=None):
+        """Sync changed files to PythonAnywhere"""
         try:
             print(f"🚀 Syncing to {self.config['hostname']}...")
-            
-            # Get password
-            password = self.get_password()
-            
-            # Create SSH connection
-            ssh = paramiko.SSHClient()
-            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            # Connect
-            ssh.connect(
-                hostname='ssh.pythonanywhere.com',
-                username=self.config['username'], 
-                password=password,
-                port=22
-            )
-            
-            print("✅ Connected to PythonAnywhere")
-            
-            # Create SCP client
-            with SCPClient(ssh.get_transport()) as scp:
-                
+            transport = self.connect(local_root)
+            manifest = self.load_manifest()
+            try:
+                plan = self.plan(transport, manifest)
+                changed = [item for item in plan if item['action'] != 'unchanged']
+                for item in plan:
+                    print(f"  {item['action']:<9} {item['file']} ({item['bytes']} of {len(item['content'])} bytes)")
+                print(f"📦 {len(changed)} of {len(plan)} files changed, "
+                      f"{sum(item['bytes'] for item in plan)} bytes to send")
+                if dry_run:
+                    print("🔍 Dry run, nothing was sent")
+                    return
+                if not changed:
+                    print("✅ Everything is up to date")
+                    return
+
+                failed = self.apply_deltas(transport, [item for item in changed if 'op' in item])
+                uploads = [item for item in changed if 'op' not in item] + failed
+
                 # Ensure remote directories exist
-                self.create_remote_directories(ssh)
-                
-                # Sync each file
-                for file_path in self.config['files_to_sync']:
-                    if os.path.exists(file_path):
-                        remote_file = f"{self.config['remote_path']}/{file_path}"
-                        print(f"📤 Uploading {file_path} → {remote_file}")
-                        
-                        # Ensure remote directory exists
-                        remote_dir = os.path.dirname(remote_file)
-                        ssh.exec_command(f'mkdir -p {remote_dir}')
-                        
-                        # Upload file
-                        scp.put(file_path, remote_file)
-                        print(f"✅ {file_path} uploaded successfully")
-                    else:
-                        print(f"⚠️  {file_path} not found, skipping")
-                
+                self.create_remote_directories(transport, uploads)
+                failed = Uploader(transport, self.config.get('upload_channels', UPLOAD_CHANNELS)).upload_all(uploads)
+
+                failed_files = {item['file'] for item in failed}
+                self.remember(manifest, [item for item in changed if item['file'] not in failed_files])
+                if failed:
+                    print(f"⚠️  {len(failed)} files were not uploaded; run the sync again to resume them")
+
                 # Reload web app
-                self.reload_webapp(ssh)
-                
-            ssh.close()
+                self.reload_webapp(transport)
+            finally:
+                transport.close()
             print(f"🎉 Sync completed! Check your app at: https://{self.config['username']}.pythonanywhere.com")
-            
+
         except Exception as e:
             print(f"❌ Error during sync: {str(e)}")
             print("💡 Check your username/password and try again")
-    
-    def create_remote_directories(self, ssh):
-        """Create necessary directories on remote server"""
-        directories = [
-            self.config['remote_path'],
-            f"{self.config['remote_path']}/templates",
-            f"{self.config['remote_path']}/data"
-        ]
-        
+
+    def remember(self, manifest, items):
+        """Record what was sent in the manifest and cache data files for the next diff"""
+        data_files = set(self.config.get('data_files', DEFAULT_DATA_FILES))
+        for item in items:
+            manifest[item['file']] = {
+                'size': len(item['content']),
+                'sha256': item['sha256'],
+                'synced_at': datetime.now().isoformat(timespec='seconds')
+            }
+            if item['file'] in data_files:
+                cache_path = os.path.join(CACHE_DIR, item['file'])
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                with open(cache_path, 'wb') as f:
+                    f.write(item['content'])
+        self.save_manifest(manifest)
+
+    def create_remote_directories(self, transport, uploads):
+        """Create the remote directories of the files to upload with one command"""
+        directories = sorted({os.path.dirname(item['remote']) for item in uploads})
+        if not directories:
+            return
+        transport.run('mkdir -p ' + ' '.join(shlex.quote(directory) for directory in directories))
         for directory in directories:
-            ssh.exec_command(f'mkdir -p {directory}')
             print(f"📁 Ensured directory exists: {directory}")
-    
-    def reload_webapp(self, ssh):
+
+    def reload_webapp(self, transport):
         """Reload the web app on PythonAnywhere"""
         try:
             # Touch the WSGI file to reload
             wsgi_path = f"{self.config['remote_path']}/flask_app.py"
-            ssh.exec_command(f'touch {wsgi_path}')
+            transport.run(f'touch {shlex.quote(wsgi_path)}')
             print("🔄 Web app reloaded")
         except Exception as e:
             print(f"⚠️  Could not reload web app automatically: {e}")
@@ -144,11 +699,16 @@ class PythonAnywhereSync:
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='show what would be sent without changing anything')
+    parser.add_argument('--local', metavar='DIR', help='sync into a local directory instead of PythonAnywhere')
+    args = parser.parse_args()
+
     print("🐍 PythonAnywhere Auto-Sync Tool")
     print("=" * 40)
-    
+
     syncer = PythonAnywhereSync()
-    syncer.sync_files()
+    syncer.sync_files(dry_run=args.dry_run, local_root=args.local)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,29 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The app modules live at the top level of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# flask_app reads its settings at import time; keep its default data set out of the project
+_APP_DIR = tempfile.mkdtemp(prefix='symptom-tests-')
+os.environ.setdefault('SYMPTOM_DATA_DIR', os.path.join(_APP_DIR, 'data'))
+os.environ.setdefault('SYMPTOM_CACHE_DIR', os.path.join(_APP_DIR, 'cache'))
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    """flask_app with its default shard replaced by one in a fresh directory"""
+    import flask_app
+    from shards import Shard
+    shard = Shard(str(tmp_path))
+    monkeypatch.setattr(flask_app, 'default_shard', shard)
+    yield flask_app
+    shard.close()
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,65 @@
+from collections import OrderedDict
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from shards import ShardPool
+
+USERS = {'alice': 'alice-secret', 'bob': 'bob-secret'}
+
+
+@pytest.fixture
+def pool(app_module, tmp_path, monkeypatch):
+    """Multi-user mode with the users above and shards under tmp_path"""
+    pool = ShardPool(str(tmp_path))
+    monkeypatch.setattr(app_module, 'shard_pool', pool)
+    monkeypatch.setattr(app_module, 'PASSWORD_HASHES', {
+        user: generate_password_hash(password, method='pbkdf2:sha256:1000') for user, password in USERS.items()
+    })
+    monkeypatch.setattr(app_module, '_verified_credentials', OrderedDict())
+    yield pool
+    for shard in list(pool._shards.values()):
+        shard.close()
+
+
+def test_requests_without_valid_credentials_are_rejected(client, pool):
+    assert client.get('/api/all-dates').status_code == 401
+    assert client.get('/api/all-dates', auth=('alice', 'wrong')).status_code == 401
+    assert client.get('/api/all-dates', auth=('mallory', 'alice-secret')).status_code == 401
+    assert client.get('/api/all-dates', auth=('alice', USERS['alice'])).status_code == 200
+
+
+def test_health_needs_credentials_to_verify(client, pool):
+    assert client.get('/health').status_code == 200
+    assert client.get('/health?verify=1').status_code == 401
+    response = client.get('/health?verify=1', auth=('bob', USERS['bob']))
+    assert response.get_json()['aggregate_mismatches'] == []
+
+
+def test_users_only_see_their_own_shard(client, pool):
+    alice, bob = ('alice', USERS['alice']), ('bob', USERS['bob'])
+    response = client.post('/api/symptoms', json={'date': '2024-01-01', 'symptoms': ['Headache']}, auth=alice)
+    assert response.status_code == 200
+
+    assert client.get('/api/all-dates', auth=alice).get_json() == ['2024-01-01']
+    assert client.get('/api/all-dates', auth=bob).get_json() == []
+    assert pool.get('alice').store.path != pool.get('bob').store.path
+
+
+def test_password_hash_is_checked_once_per_login(client, pool, app_module, monkeypatch):
+    calls = []
+    check = app_module.check_password_hash
+
+    def counting_check(password_hash, password):
+        calls.append(password)
+        return check(password_hash, password)
+
+    monkeypatch.setattr(app_module, 'check_password_hash', counting_check)
+    for _ in range(3):
+        assert client.get('/api/all-dates', auth=('alice', USERS['alice'])).status_code == 200
+    assert calls == [USERS['alice']]
+
+    # Wrong passwords are never cached
+    for _ in range(2):
+        assert client.get('/api/all-dates', auth=('alice', 'wrong')).status_code == 401
+    assert calls == [USERS['alice'], 'wrong', 'wrong']
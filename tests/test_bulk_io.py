@@ -0,0 +1,49 @@
+import bulk_io
+from shards import Shard
+
+LOG = {
+    '2024-01-01': [{'datetime': '2024-01-01 08:00:00', 'symptoms': ['Headache', 'Nausea'], 'cycleDay': 3,
+                    'comment': 'after coffee'}],
+    '2024-01-02': [{'datetime': '2024-01-02 08:00:00', 'symptoms': []},
+                   {'datetime': '2024-01-02 21:00:00', 'symptoms': ['Fatigue'], 'cycleDay': 4}],
+}
+
+
+def test_overflowing_cycle_day_is_a_line_error():
+    lines = [
+        '{"date": "2024-01-01", "symptoms": [], "cycleDay": 1e999}\n',
+        '{"date": "2024-01-02", "symptoms": [], "cycleDay": 2}\n',
+    ]
+    records = list(bulk_io.parse_ndjson(lines))
+    assert records[0][0] == 1 and records[0][4]
+    assert records[1][4] is None
+
+    rows = ['date,datetime,cycleDay,symptoms,comment\n', '2024-01-01,,1e999,,\n', '2024-01-02,,inf,,\n']
+    assert all(error for _, _, _, _, error in bulk_io.parse_csv(rows))
+
+
+def test_import_reports_bad_lines_and_keeps_the_rest(client, app_module):
+    body = ('{"date": "2024-01-01", "symptoms": [], "cycleDay": 1e999}\n'
+            '{"date": "2024-01-02", "symptoms": ["Headache"], "cycleDay": 2}\n')
+    response = client.post('/api/import', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert summary['errorCount'] == 1 and summary['errors'][0]['line'] == 1
+    assert app_module.default_shard.store.dates() == ['2024-01-02']
+
+
+def test_export_then_import_round_trips(client, app_module, tmp_path):
+    app_module.default_shard.store.save(LOG)
+    for export_format in bulk_io.EXPORT_FORMATS:
+        exported = client.get(f'/api/export?format={export_format}').get_data()
+
+        (tmp_path / export_format).mkdir()
+        target = Shard(str(tmp_path / export_format))
+        app_module.default_shard, source = target, app_module.default_shard
+        try:
+            response = client.post(f'/api/import?format={export_format}', data=exported)
+            assert response.get_json()['errorCount'] == 0
+            assert target.store.load() == LOG
+        finally:
+            app_module.default_shard = source
+            target.close()
@@ -0,0 +1,53 @@
+import pytest
+
+
+@pytest.mark.parametrize('url', ['/api/all-dates', '/api/symptoms?date=2024-01-01', '/api/last-cycle-day', '/dashboard'])
+def test_matching_etag_gets_a_304_without_a_body(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    cached = client.get(url, headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.get_data() == b''
+    assert cached.headers['ETag'] == etag
+
+
+def test_304_skips_the_view(client, app_module, monkeypatch):
+    etag = client.get('/api/all-dates').headers['ETag']
+
+    def fail(*args, **kwargs):
+        raise AssertionError('data loaded for a 304')
+
+    store = app_module.default_shard.store
+    monkeypatch.setattr(store, 'dates', fail)
+    monkeypatch.setattr(store, 'load', fail)
+    assert client.get('/api/all-dates', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_a_save_changes_the_validators(client):
+    first = client.get('/api/all-dates')
+    client.post('/api/symptoms', json={'date': '2024-01-01', 'symptoms': ['Headache']})
+
+    response = client.get('/api/all-dates', headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != first.headers['ETag']
+    assert response.get_json() == ['2024-01-01']
+
+    # The save was less than a second ago, so If-Modified-Since cannot be trusted yet
+    response = client.get('/api/all-dates', headers={'If-Modified-Since': response.headers['Last-Modified']})
+    assert response.status_code == 200
+
+
+def test_if_modified_since(client):
+    last_modified = client.get('/api/all-dates').headers['Last-Modified']
+    assert client.get('/api/all-dates', headers={'If-Modified-Since': last_modified}).status_code == 304
+
+
+def test_compressed_responses_get_their_own_etag(client):
+    plain = client.get('/api/timeline')
+    gzipped = client.get('/api/timeline', headers={'Accept-Encoding': 'gzip'})
+    assert plain.headers['ETag'] != gzipped.headers['ETag']
+    assert 'Accept-Encoding' in gzipped.headers['Vary']
+    assert client.get('/api/timeline', headers={'If-None-Match': plain.headers['ETag'],
+                                                 'Accept-Encoding': 'gzip'}).status_code == 200
@@ -0,0 +1,45 @@
+import random
+
+from dashboard import DashboardAggregates, compute_analytics, get_dashboard_stats
+
+
+def entry(symptoms, cycle_day=None):
+    result = {'datetime': '2024-01-01 08:00:00', 'symptoms': symptoms}
+    if cycle_day is not None:
+        result['cycleDay'] = cycle_day
+    return [result]
+
+
+def test_aggregates_stay_equal_to_a_full_recompute_across_writes():
+    rng = random.Random(7)
+    names = ['Headache', 'Cramps: mild', 'Cramps: severe', 'Nausea', 'Fatigue']
+    data = {}
+    aggregates = DashboardAggregates()
+    aggregates.rebuild(data)
+    for _ in range(300):
+        date = f"2024-{rng.randint(1, 3):02d}-{rng.randint(1, 28):02d}"
+        new = None if rng.random() < 0.1 else entry(rng.sample(names, rng.randint(0, 3)), rng.randint(1, 28))
+        if new is None and date not in data:
+            continue
+        aggregates.apply(date, data.get(date), new)
+        if new is None:
+            del data[date]
+        else:
+            data[date] = new
+        assert aggregates.verify(data) == []
+    assert aggregates.to_stats(data) == get_dashboard_stats(data)
+
+
+def test_non_integer_cycle_days_are_skipped():
+    data = {
+        '2024-01-01': entry(['Headache'], 3),
+        '2024-01-02': entry(['Nausea'], '4'),
+        '2024-01-03': entry(['Nausea'], 4.5),
+    }
+    aggregates = DashboardAggregates()
+    aggregates.rebuild(data)
+    stats = aggregates.to_stats(data)
+    assert stats['cycle_day_patterns']['most_common'] == [(3, 1)]
+    assert stats['symptom_frequency'] == {'Nausea': 2, 'Headache': 1}
+    assert aggregates.verify(data) == []
+    assert list(compute_analytics(data)['cycle_analysis']) == [3]
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+
+def test_cycle_day_is_converted_to_an_int(client, app_module):
+    response = client.post('/api/symptoms', json={'date': '2024-01-01', 'symptoms': ['Headache'], 'cycleDay': '4'})
+    assert response.status_code == 200
+    assert app_module.default_shard.store.get('2024-01-01')[0]['cycleDay'] == 4
+
+
+def test_invalid_cycle_day_is_rejected_before_saving(client, app_module):
+    # Register the dashboard aggregates first, as a visit to /dashboard does
+    app_module.default_shard.dashboard_aggregates
+    for cycle_day in ('four', True, 4.5, 0, 1e999):
+        response = client.post('/api/symptoms', json={'date': '2024-01-01', 'symptoms': [], 'cycleDay': cycle_day})
+        assert response.status_code == 400, cycle_day
+    assert app_module.default_shard.store.dates() == []
+    for url in ('/api/all-dates', '/api/last-cycle-day', '/api/symptoms?date=2024-01-01', '/dashboard'):
+        assert client.get(url).status_code == 200, url
+
+
+def test_store_rejects_entries_the_views_cannot_count(app_module):
+    store = app_module.default_shard.store
+    with pytest.raises(ValueError):
+        store.put('2024-01-01', [{'symptoms': ['Headache'], 'cycleDay': '4'}])
+    assert store.dates() == []
+
+
+def test_logs_with_string_cycle_days_still_load(client, app_module):
+    store = app_module.default_shard.store
+    with open(store.path, 'w', encoding='utf-8') as f:
+        json.dump({'2024-01-01': [{'symptoms': ['Headache'], 'cycleDay': '4'}]}, f)
+    app_module.default_shard.dashboard_aggregates
+    for url in ('/api/all-dates', '/api/symptoms?date=2024-01-01', '/dashboard'):
+        assert client.get(url).status_code == 200, url
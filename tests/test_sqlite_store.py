@@ -0,0 +1,61 @@
+import json
+import sqlite3
+
+import pytest
+
+from symptom_store import SqliteStore, migrate_json_to_sqlite
+
+
+def sample_log(days=30):
+    data = {}
+    for day in range(1, days + 1):
+        data[f"2024-01-{day:02d}"] = [
+            {'datetime': f"2024-01-{day:02d} 08:00:00", 'symptoms': ['Headache', f"Note {day % 3}"],
+             'cycleDay': day, 'comment': 'morning'},
+            {'datetime': f"2024-01-{day:02d} 20:00:00", 'symptoms': [], 'mood': 'ok'},
+        ]
+    return data
+
+
+def test_round_trip_through_a_fresh_connection(tmp_path):
+    path = str(tmp_path / 'log.db')
+    data = sample_log()
+    SqliteStore(path).save(data)
+
+    store = SqliteStore(path)
+    assert store.load() == data
+    assert store.get('2024-01-05') == data['2024-01-05']
+    assert store.get('2024-02-01') == []
+
+
+def test_get_range_returns_only_the_dates_inside_it(tmp_path):
+    store = SqliteStore(str(tmp_path / 'log.db'))
+    data = sample_log()
+    store.save(data)
+    expected = {date: entries for date, entries in data.items() if '2024-01-10' <= date <= '2024-01-12'}
+    assert store.get_range('2024-01-10', '2024-01-12') == expected
+
+
+def test_reads_do_not_depend_on_the_sql_variable_limit(tmp_path):
+    if not hasattr(sqlite3.Connection, 'setlimit'):
+        pytest.skip('needs sqlite3.Connection.setlimit (Python 3.11+)')
+    path = str(tmp_path / 'log.db')
+    data = sample_log(days=1)
+    for day in range(2000):
+        data[f"2000-{day:04d}"] = [{'datetime': '2000-01-01 08:00:00', 'symptoms': ['Fatigue']}]
+    SqliteStore(path).save(data)
+
+    store = SqliteStore(path)
+    # The limit of SQLite builds before 3.32
+    store._conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+    assert store.load() == data
+    assert len(store.get_range('2000-0000', '2000-9999')) == 2000
+
+
+def test_migration_copies_the_json_log(tmp_path):
+    json_path = tmp_path / 'symptom_log.json'
+    data = sample_log()
+    json_path.write_text(json.dumps(data))
+
+    assert migrate_json_to_sqlite(str(json_path), str(tmp_path / 'log.db')) == len(data)
+    assert SqliteStore(str(tmp_path / 'log.db')).load() == data
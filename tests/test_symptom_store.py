@@ -0,0 +1,28 @@
+import json
+
+from symptom_store import JournalStore
+
+
+def test_put_after_torn_journal_line_is_kept(tmp_path):
+    path = str(tmp_path / 'symptom_log.json')
+    store = JournalStore(path)
+    store.put('2024-01-01', [{'symptoms': ['headache']}])
+    # A crash in the middle of the next append leaves a line without its newline
+    with open(store.journal_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(['2024-01-02', [{'symptoms': ['nausea']}]])[:15])
+
+    JournalStore(path).put('2024-01-03', [{'symptoms': ['fatigue']}])
+
+    reopened = JournalStore(path)
+    assert sorted(reopened.dates()) == ['2024-01-01', '2024-01-03']
+    assert reopened.get('2024-01-03') == [{'symptoms': ['fatigue']}]
+
+
+def test_put_many_after_torn_journal_line_is_kept(tmp_path):
+    path = str(tmp_path / 'symptom_log.json')
+    with open(path + '.journal', 'w', encoding='utf-8') as f:
+        f.write('["2024-01-01",[{"symptoms":["headache"]}]]\n["2024-01-0')
+
+    JournalStore(path).put_many({'2024-01-02': [{'symptoms': []}], '2024-01-03': [{'symptoms': []}]})
+
+    assert sorted(JournalStore(path).dates()) == ['2024-01-01', '2024-01-02', '2024-01-03']
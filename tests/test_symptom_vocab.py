@@ -0,0 +1,43 @@
+import gc
+import weakref
+
+from shards import Shard, ShardPool
+from symptom_vocab import normalize_symptoms
+
+
+def test_normalizing_does_not_record_anything():
+    assert normalize_symptoms(['  Cramps :mild ', 'Headache', '', ' ', 3]) == ['Cramps: mild', 'Headache']
+
+
+def test_shards_keep_their_own_vocabulary(tmp_path):
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+    first, second = Shard(str(tmp_path / 'a')), Shard(str(tmp_path / 'b'))
+    try:
+        first.put('2024-01-01', [{'symptoms': ['Headache', 'Cramps: mild']}])
+        second.put('2024-01-01', [{'symptoms': ['Nausea']}])
+        first.window_stats.window('2024-01-01', '2024-01-01')
+        second.window_stats.window('2024-01-01', '2024-01-01')
+
+        assert sorted(first.vocabulary.records) == ['Cramps: mild', 'Headache']
+        assert sorted(second.vocabulary.records) == ['Nausea']
+        assert first.symptom_index.search('a') == (['Cramps: mild', 'Headache'], ['2024-01-01'])
+    finally:
+        first.close()
+        second.close()
+
+
+def test_evicted_shards_release_their_vocabulary(tmp_path):
+    pool = ShardPool(str(tmp_path), max_open=1)
+    shard = pool.get('alice')
+    shard.put('2024-01-01', [{'symptoms': ['Headache']}])
+    vocabulary = weakref.ref(shard.vocabulary)
+    thread = shard.stats_worker._thread
+    del shard
+
+    pool.get('bob').close()
+    # The stopped stats worker thread holds the shard until it exits
+    thread.join(5)
+    del thread
+    gc.collect()
+    assert vocabulary() is None
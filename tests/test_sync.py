@@ -0,0 +1,105 @@
+import json
+import random
+
+import pytest
+
+import sync_to_pythonanywhere as sync
+
+
+def apply_patch(base, edits):
+    parts = []
+    position = 0
+    for start, end, data in edits:
+        parts.append(base[position:start])
+        parts.append(data)
+        position = end
+    parts.append(base[position:])
+    return b''.join(parts)
+
+
+def symptom_log(days, symptom='Headache'):
+    log = {f"2024-{1 + day // 28:02d}-{1 + day % 28:02d}": [{'symptoms': [symptom, f"Note {day}"]}]
+           for day in range(days)}
+    return json.dumps(log, indent=2).encode('utf-8')
+
+
+def test_make_patch_rebuilds_the_new_content():
+    rng = random.Random(3)
+    base = symptom_log(200)
+    for _ in range(20):
+        lines = base.split(b'\n')
+        for _ in range(rng.randint(1, 5)):
+            index = rng.randrange(len(lines))
+            lines[index:index + rng.randint(0, 2)] = [b'  "edited": %d,' % rng.randrange(1000)] * rng.randint(0, 2)
+        new = b'\n'.join(lines)
+        edits = sync.make_patch(base, new)
+        assert apply_patch(base, edits) == new
+        assert sum(len(data) for _, _, data in edits) < len(new)
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A project directory with a sync config, and the directory it syncs into"""
+    local = tmp_path / 'local'
+    (local / 'data').mkdir(parents=True)
+    (local / 'flask_app.py').write_text('print("app")\n')
+    (local / 'data' / 'symptom_log.json').write_bytes(symptom_log(300))
+    (local / 'data' / 'symptom_log.json.journal').write_bytes(b'["2024-01-01", []]\n' * 200)
+    (local / 'pythonanywhere_config.json').write_text(json.dumps({
+        'username': 'tester',
+        'hostname': 'tester.pythonanywhere.com',
+        'remote_path': '',
+        'files_to_sync': ['flask_app.py', 'data/symptom_log.json', 'data/symptom_log.json.journal'],
+        'data_files': list(sync.DEFAULT_DATA_FILES)
+    }))
+    monkeypatch.chdir(local)
+    return local, tmp_path / 'remote'
+
+
+def plan_actions(syncer):
+    return {item['file']: item['action'] for item in syncer.plan(sync.LocalTransport(), syncer.load_manifest())}
+
+
+def test_second_sync_sends_a_patch_and_an_append(project):
+    local, remote = project
+    syncer = sync.PythonAnywhereSync()
+    syncer.sync_files(local_root=str(remote))
+    for name in ('flask_app.py', 'data/symptom_log.json', 'data/symptom_log.json.journal'):
+        assert (remote / name).read_bytes() == (local / name).read_bytes()
+
+    (local / 'data' / 'symptom_log.json').write_bytes(symptom_log(300).replace(b'"Note 150"', b'"Nausea"'))
+    with open(local / 'data' / 'symptom_log.json.journal', 'ab') as f:
+        f.write(b'["2024-01-02", []]\n')
+
+    syncer = sync.PythonAnywhereSync()
+    syncer.config['remote_path'] = str(remote)
+    plan = {item['file']: item for item in syncer.plan(sync.LocalTransport(), syncer.load_manifest())}
+    assert plan['flask_app.py']['action'] == 'unchanged'
+    assert plan['data/symptom_log.json']['action'] == 'patch'
+    assert plan['data/symptom_log.json']['bytes'] < 200
+    assert plan['data/symptom_log.json.journal']['action'] == 'append'
+
+    syncer.sync_files(local_root=str(remote))
+    for name in ('data/symptom_log.json', 'data/symptom_log.json.journal'):
+        assert (remote / name).read_bytes() == (local / name).read_bytes()
+    assert set(plan_actions(syncer).values()) == {'unchanged'}
+
+
+def test_remote_changes_fall_back_to_a_whole_upload(project):
+    local, remote = project
+    syncer = sync.PythonAnywhereSync()
+    syncer.sync_files(local_root=str(remote))
+
+    # The remote copy changed behind the manifest's back: no patch against it
+    (remote / 'data' / 'symptom_log.json').write_bytes(b'{}')
+    (local / 'data' / 'symptom_log.json').write_bytes(symptom_log(301))
+    assert plan_actions(syncer)['data/symptom_log.json'] == 'upload'
+
+    syncer.sync_files(local_root=str(remote))
+    assert (remote / 'data' / 'symptom_log.json').read_bytes() == symptom_log(301)
+
+
+def test_dry_run_sends_nothing(project):
+    local, remote = project
+    sync.PythonAnywhereSync().sync_files(dry_run=True, local_root=str(remote))
+    assert not (remote / 'flask_app.py').exists()
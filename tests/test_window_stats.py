@@ -0,0 +1,37 @@
+from window_stats import WindowStats
+
+
+def history(days):
+    return {f"2024-01-{day:02d}": [{'symptoms': ['Headache', 'Cramps: mild'], 'cycleDay': day}]
+            for day in range(1, days + 1)}
+
+
+def test_saving_the_next_day_grows_the_span_without_a_rebuild(monkeypatch):
+    stats = WindowStats()
+    stats.rebuild(history(10))
+    assert stats.window() == (10, {'Cramps: mild': 10, 'Headache': 10})
+
+    def fail(data):
+        raise AssertionError("rebuild() called")
+    monkeypatch.setattr(stats, 'rebuild', fail)
+    entries = [{'symptoms': ['Headache'], 'cycleDay': 12}]
+    stats.apply('2024-01-12', None, entries)
+
+    # Only the new slots are stale
+    assert stats._stale_from == 11
+    data = dict(history(10), **{'2024-01-12': entries})
+    fresh = WindowStats()
+    fresh.rebuild(data)
+    assert stats.date_range() == ('2024-01-01', '2024-01-12')
+    assert stats.window() == fresh.window() == (11, {'Headache': 11, 'Cramps: mild': 10})
+    assert stats.phases() == fresh.phases()
+    assert stats.rolling(7, '2024-01-01', '2024-01-14') == fresh.rolling(7, '2024-01-01', '2024-01-14')
+
+
+def test_saving_a_day_before_the_span_recomputes_it():
+    stats = WindowStats()
+    stats.rebuild(history(3))
+    stats.window()
+    stats.apply('2023-12-31', None, [{'symptoms': ['Nausea']}])
+    assert stats.date_range() == ('2023-12-31', '2024-01-03')
+    assert stats.window('2023-12-31', '2023-12-31') == (1, {'Nausea': 1})
@@ -0,0 +1,128 @@
+import gc
+import json
+import os
+import threading
+import weakref
+
+import pytest
+
+from shards import Shard, ShardPool
+from symptom_store import JournalStore, SymptomStore
+from write_behind import WriteBehindQueue, _try_lock
+
+# No pid is this large on Linux, so the journal's owner is certainly dead
+DEAD_PID = 2 ** 22 + 1
+
+
+def write_journal(path, updates):
+    with open(path, 'w', encoding='utf-8') as f:
+        for date, entries in updates.items():
+            f.write(json.dumps([date, entries]) + '\n')
+
+
+def entries(saved_at, symptom='headache'):
+    return [{'datetime': f"2024-01-01 {saved_at}", 'symptoms': [symptom]}]
+
+
+def test_recover_writes_and_deletes_a_dead_process_journal(tmp_path):
+    store = JournalStore(str(tmp_path / 'symptom_log.json'))
+    journal = f"{store.path}.wal.{DEAD_PID}"
+    write_journal(journal, {'2024-01-01': [{'symptoms': ['headache']}]})
+
+    queue = WriteBehindQueue(store)
+
+    assert queue.recovered_dates == 1
+    assert not os.path.exists(journal)
+    assert JournalStore(store.path).get('2024-01-01') == [{'symptoms': ['headache']}]
+
+
+def test_recover_skips_a_journal_whose_owner_holds_the_lock(tmp_path):
+    store = JournalStore(str(tmp_path / 'symptom_log.json'))
+    journal = f"{store.path}.wal.{DEAD_PID}"
+    write_journal(journal, {'2024-01-01': [{'symptoms': ['headache']}]})
+    fd = os.open(journal, os.O_RDWR)
+    try:
+        assert _try_lock(fd)
+        queue = WriteBehindQueue(store)
+        assert queue.recovered_dates == 0
+        assert os.path.exists(journal)
+        assert store.dates() == []
+    finally:
+        os.close(fd)
+
+
+@pytest.mark.parametrize('backend', ['json', 'journal'])
+def test_evicting_a_shard_flushes_pending_saves_and_frees_it(tmp_path, backend):
+    pool = ShardPool(str(tmp_path), backend, max_open=1, write_behind_latency=60)
+    shard = pool.get('alice')
+    shard.put('2024-01-01', [{'symptoms': ['headache']}])
+    shard.put('2024-01-02', [{'symptoms': ['fatigue']}])
+    assert shard.write_behind.stats()['queue_depth'] == 2
+    queue = weakref.ref(shard.write_behind)
+    journal = shard.write_behind.journal_path()
+    data_dir = shard.data_dir
+    del shard
+
+    pool.get('bob')
+
+    assert not os.path.exists(journal)
+    reopened = Shard(data_dir, backend)
+    assert sorted(reopened.store.dates()) == ['2024-01-01', '2024-01-02']
+    reopened.close()
+    gc.collect()
+    assert queue() is None
+
+
+def test_recover_keeps_dates_saved_again_since(tmp_path):
+    store = JournalStore(str(tmp_path / 'symptom_log.json'))
+    store.put('2024-01-01', entries('20:00:00', 'nausea'))
+    journal = f"{store.path}.wal.{DEAD_PID}"
+    write_journal(journal, {'2024-01-01': entries('08:00:00'), '2024-01-02': entries('09:00:00')})
+
+    queue = WriteBehindQueue(store)
+
+    assert (queue.recovered_dates, queue.skipped_dates) == (1, 1)
+    assert not os.path.exists(journal)
+    reopened = JournalStore(store.path)
+    assert reopened.get('2024-01-01') == entries('20:00:00', 'nausea')
+    assert reopened.get('2024-01-02') == entries('09:00:00')
+
+
+@pytest.mark.parametrize('store_class', [SymptomStore, JournalStore])
+def test_flush_keeps_dates_another_worker_saved_later(tmp_path, store_class):
+    store = store_class(str(tmp_path / 'symptom_log.json'))
+    queue = WriteBehindQueue(store, max_latency=60)
+    try:
+        queue.submit('2024-01-01', entries('08:00:00'))
+        queue.submit('2024-01-02', entries('08:00:00'))
+        store_class(store.path).put('2024-01-01', entries('20:00:00', 'nausea'))
+
+        assert queue.flush() == 1
+        assert queue.stats()['skipped_dates'] == 1
+        for reader in (store, store_class(store.path)):
+            assert reader.get('2024-01-01') == entries('20:00:00', 'nausea')
+            assert reader.get('2024-01-02') == entries('08:00:00')
+    finally:
+        queue.stop()
+
+
+def test_start_up_does_not_hold_the_queue_lock_while_waiting_for_the_store(tmp_path):
+    store = JournalStore(str(tmp_path / 'symptom_log.json'))
+    queue = WriteBehindQueue(store, max_latency=60)
+    # Gives start-up a journal to recover, which needs the store lock
+    write_journal(f"{store.path}.wal.{DEAD_PID}", {'2024-01-02': entries('09:00:00')})
+
+    submitter = threading.Thread(target=queue.submit, args=('2024-01-01', entries('08:00:00')))
+    reader = threading.Thread(target=queue.stats)
+    try:
+        with store.reading():
+            submitter.start()
+            submitter.join(0.5)
+            reader.start()
+            reader.join(5)
+            assert not reader.is_alive()
+        submitter.join(5)
+        assert not submitter.is_alive()
+    finally:
+        queue.stop()
+    assert store.get('2024-01-02') == entries('09:00:00')
@@ -0,0 +1,238 @@
+#!/usr/bin/python3.10
+
+"""
+Window analytics for Symptom Tracker
+Symptom counts over any [from, to] window, rolling 7/30/90-day counts and
+per-cycle-phase breakdowns, answered from per-symptom prefix sums over
+date ordinals: a window costs two array lookups per symptom, however many
+days it spans.
+"""
+
+from array import array
+from collections import defaultdict
+from datetime import date as date_type
+from itertools import accumulate
+
+from dashboard import date_ordinal
+from symptom_vocab import SymptomVocabulary
+
+# (name, first cycle day, last cycle day or None for open-ended)
+CYCLE_PHASES = (
+    ('menstrual', 1, 5),
+    ('follicular', 6, 13),
+    ('ovulation', 14, 16),
+    ('luteal', 17, None),
+)
+# Dates without a usable cycleDay
+UNKNOWN_PHASE = 'unknown'
+PHASE_NAMES = tuple(name for name, _, _ in CYCLE_PHASES) + (UNKNOWN_PHASE,)
+
+ROLLING_WINDOWS = (7, 30, 90)
+
+
+def cycle_phase(cycle_day):
+    """Return the index in PHASE_NAMES of a cycleDay value"""
+    if isinstance(cycle_day, int) and not isinstance(cycle_day, bool) and cycle_day >= 1:
+        for index, (_, first, last) in enumerate(CYCLE_PHASES):
+            if cycle_day >= first and (last is None or cycle_day <= last):
+                return index
+    return len(CYCLE_PHASES)
+
+
+class WindowStats:
+    """Prefix sums of logged days and symptom counts per cycle phase (a store view)
+
+    For every (phase, record id) pair, prefix[key][i] is the number of
+    occurrences on the first i days of the span starting at self.first
+    (record id None counts logged days). Like the dashboard, only the
+    latest entry of a date counts. Writes only record the changed date;
+    the arrays are brought up to date on the next query, from the
+    earliest changed day on, so logging today recomputes one slot. A
+    date past the end of the span grows the arrays in place; only a date
+    before its start makes the next query recompute everything.
+    """
+
+    def __init__(self, vocabulary=None):
+        self.vocabulary = SymptomVocabulary() if vocabulary is None else vocabulary
+        self.rebuild({})
+
+    def _day(self, ordinal, entries):
+        """Return (ordinal, phase, record ids) for one date"""
+        record_ids = ()
+        phase = len(CYCLE_PHASES)
+        if entries and isinstance(entries, list):
+            latest_entry = entries[-1]
+            phase = cycle_phase(latest_entry.get('cycleDay'))
+            record_ids = tuple(self.vocabulary.record(symptom).id for symptom in latest_entry.get('symptoms', [])
+                               if isinstance(symptom, str))
+        return ordinal, phase, record_ids
+
+    def rebuild(self, data):
+        """Record every date; the prefix sums are built on the first query"""
+        self.days = {}
+        for date, entries in data.items():
+            ordinal = date_ordinal(date)
+            if ordinal is not None:
+                self.days[date] = self._day(ordinal, entries)
+        self.first = None
+        self.size = 0
+        self.prefix = {}
+        self._stale_from = 0
+
+    def apply(self, date, old_entries, new_entries):
+        """Replace one date and mark the prefix sums stale from its day on"""
+        ordinal = date_ordinal(date)
+        if ordinal is None:
+            return
+        if new_entries is None:
+            self.days.pop(date, None)
+        else:
+            self.days[date] = self._day(ordinal, new_entries)
+
+        if self.first is None or ordinal < self.first:
+            # Not built yet, or before the span: recompute with a new span
+            self.first = None
+            self._stale_from = 0
+            return
+        index = ordinal - self.first
+        if index >= self.size:
+            # Past the end (the first save of a new day): carry every sum forward
+            grow = index + 1 - self.size
+            for sums in self.prefix.values():
+                sums.extend(array('i', [sums[-1]]) * grow)
+            self.size += grow
+        if self._stale_from is None or index < self._stale_from:
+            self._stale_from = index
+
+    def _refresh(self):
+        """Recompute the prefix sums from the earliest stale day to the end of the span"""
+        start = self._stale_from
+        if start is None:
+            return
+        if self.first is None:
+            ordinals = [ordinal for ordinal, _, _ in self.days.values()]
+            self.first = min(ordinals) if ordinals else 0
+            self.size = max(ordinals) - self.first + 1 if ordinals else 0
+            self.prefix = {}
+            start = 0
+
+        events = defaultdict(list)
+        for ordinal, phase, record_ids in self.days.values():
+            index = ordinal - self.first
+            if index >= start:
+                events[(phase, None)].append(index)
+                for record_id in record_ids:
+                    events[(phase, record_id)].append(index)
+
+        for key in set(self.prefix) | set(events):
+            sums = self.prefix.get(key)
+            if sums is None:
+                sums = self.prefix[key] = array('i', [0]) * (start + 1)
+            running = sums[start]
+            del sums[start:]
+            counts = [0] * (self.size - start)
+            for index in events.get(key, ()):
+                counts[index - start] += 1
+            sums.extend(accumulate(counts, initial=running))
+            if not sums[-1]:
+                del self.prefix[key]
+        self._stale_from = None
+
+    def _bounds(self, start, end):
+        """Return the [lo, hi) span indexes of a from/to date window (either may be None)"""
+        lo = 0 if start is None else date_ordinal(start) - self.first
+        hi = self.size if end is None else date_ordinal(end) - self.first + 1
+        return max(lo, 0), min(hi, self.size)
+
+    def _counts(self, lo, hi, phases=None):
+        """Return (logged days, {symptom: count}) in span indexes [lo, hi) for the given phase indexes"""
+        days = 0
+        symptoms = defaultdict(int)
+        if lo >= hi:
+            return days, {}
+        for (phase, record_id), sums in self.prefix.items():
+            if phases is not None and phase not in phases:
+                continue
+            count = sums[hi] - sums[lo]
+            if not count:
+                continue
+            if record_id is None:
+                days += count
+            else:
+                symptoms[self.vocabulary.by_id[record_id].raw] += count
+        return days, dict(sorted(symptoms.items(), key=lambda item: (-item[1], item[0])))
+
+    def date_range(self):
+        """Return (first, last) logged date covered by the prefix sums, or (None, None)"""
+        self._refresh()
+        if not self.size:
+            return None, None
+        return (date_type.fromordinal(self.first).isoformat(),
+                date_type.fromordinal(self.first + self.size - 1).isoformat())
+
+    def window(self, start=None, end=None):
+        """Return (logged days, {symptom: count}) for dates in [start, end]
+
+        Raises ValueError for dates that are not 'YYYY-MM-DD'.
+        """
+        self._refresh()
+        _check_dates(start, end)
+        if not self.size:
+            return 0, {}
+        return self._counts(*self._bounds(start, end))
+
+    def phases(self, start=None, end=None):
+        """Return {phase name: (logged days, {symptom: count})} for dates in [start, end]"""
+        self._refresh()
+        _check_dates(start, end)
+        if not self.size:
+            return {name: (0, {}) for name in PHASE_NAMES}
+        lo, hi = self._bounds(start, end)
+        return {name: self._counts(lo, hi, (index,)) for index, name in enumerate(PHASE_NAMES)}
+
+    def rolling(self, window, start, end, step=1, symptoms=None):
+        """Return trailing window counts for every step-th day in [start, end]
+
+        Result: (dates, logged days per point, {symptom: counts per point}).
+        Each point counts the window days ending at (and including) its
+        date. symptoms limits the series to those symptom strings.
+        """
+        self._refresh()
+        _check_dates(start, end)
+        first = date_ordinal(start)
+        points = list(range(first, date_ordinal(end) + 1, step))
+        dates = [date_type.fromordinal(ordinal).isoformat() for ordinal in points]
+        if not self.size:
+            return dates, [0] * len(points), {name: [0] * len(points) for name in symptoms or ()}
+
+        # Span indexes of each window's [lo, hi), clamped to the span
+        last_index = self.size
+        bounds = [(min(max(ordinal - self.first - window + 1, 0), last_index),
+                   min(max(ordinal - self.first + 1, 0), last_index)) for ordinal in points]
+
+        wanted = None if symptoms is None else set(symptoms)
+        days = [0] * len(points)
+        series = {}
+        for (phase, record_id), sums in self.prefix.items():
+            if record_id is None:
+                values = days
+            else:
+                name = self.vocabulary.by_id[record_id].raw
+                if wanted is not None and name not in wanted:
+                    continue
+                values = series.get(name)
+                if values is None:
+                    values = series[name] = [0] * len(points)
+            for index, (lo, hi) in enumerate(bounds):
+                values[index] += sums[hi] - sums[lo]
+
+        for name in wanted or ():
+            series.setdefault(name, [0] * len(points))
+        return dates, days, dict(sorted(series.items()))
+
+
+def _check_dates(*dates):
+    """Raise ValueError unless every date is None or a valid 'YYYY-MM-DD' string"""
+    for date in dates:
+        if date is not None and date_ordinal(date) is None:
+            raise ValueError(f"Invalid date: {date}")
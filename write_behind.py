@@ -0,0 +1,319 @@
+#!/usr/bin/python3.10
+
+"""
+Write-behind saves for Symptom Tracker
+In write-behind mode a save appends one line to a per-process journal
+(<data file>.wal.<pid>), fsyncs it and updates the in-memory store; the
+request returns as soon as the line is durable. A writer thread then
+writes the queued dates to the store with one put_many() per batch.
+Repeated saves of the same date coalesce into a single write, and no
+save waits longer than max_latency seconds to reach the store.
+
+Other worker processes see a save once it is flushed. Journals left
+behind by a process that exited before flushing are written to the store
+when the next worker opens it. Flushes and recovery skip dates that were
+saved again with a later entry datetime in the meantime.
+
+Lock order: the store lock is always taken before the queue lock; start-up
+(which may write recovered journals) runs without the queue lock.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import weakref
+
+try:
+    import fcntl
+except ImportError:  # Windows (local development)
+    fcntl = None
+    import msvcrt
+
+import metrics
+
+# Attempts at locking this process's journal while another worker recovers a stale one
+JOURNAL_LOCK_ATTEMPTS = 50
+
+# Started queues of this process, stopped at exit; weak so evicted shards can be freed
+_running = weakref.WeakSet()
+
+
+@atexit.register
+def _stop_all():
+    """Flush and stop every queue still running in this process"""
+    for queue in list(_running):
+        queue.stop()
+
+
+def _try_lock(fd):
+    """Take an exclusive lock on an open file without blocking; return True on success"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _is_linked(fd, path):
+    """Return True if path still names the file open as fd (it was not unlinked or replaced)"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    opened = os.fstat(fd)
+    return (st.st_dev, st.st_ino) == (opened.st_dev, opened.st_ino)
+
+
+def read_journal(path):
+    """Return {date: entries} from a write-behind journal, the last line of a date wins"""
+    updates = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                date, entries = json.loads(line)
+            except (ValueError, TypeError):
+                # Torn write from an interrupted append, ignore it
+                continue
+            updates[date] = entries
+    return updates
+
+
+class WriteBehindQueue:
+    """Journaled, coalescing write queue in front of a store
+
+    submit() makes a save durable in this process's journal and visible
+    through store.stage(); the writer thread flushes all queued dates with
+    one store.put_many() at most max_latency seconds after the oldest one
+    was queued, or as soon as max_batch dates are waiting. Like the stats
+    worker, the thread and the journal are opened lazily in each process.
+    """
+
+    def __init__(self, store, max_latency=1.0, max_batch=500):
+        if not store.supports_staging:
+            raise ValueError(f"{type(store).__name__} does not support write-behind saves")
+        self.store = store
+        self.max_latency = max_latency
+        self.max_batch = max_batch
+        self._pending = {}
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._journal_fd = None
+        self._stopped = False
+
+        # Counters for monitoring
+        self.submitted = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.flushed_dates = 0
+        self.recovered_dates = 0
+        self.skipped_dates = 0
+        self.errors = 0
+        self.last_error = None
+        self.last_flush_ms = None
+
+        self.recover()
+
+    def journal_path(self, pid=None):
+        """Return the journal file of a process (this one by default)"""
+        return f"{self.store.path}.wal.{pid or os.getpid()}"
+
+    def recover(self):
+        """Write journals of processes that exited before flushing, then delete them
+
+        A journal whose lock can be taken has no live owner.
+        """
+        directory = os.path.dirname(os.path.abspath(self.store.path))
+        prefix = os.path.basename(self.store.path) + '.wal.'
+        for name in sorted(os.listdir(directory)):
+            if not name.startswith(prefix) or not name[len(prefix):].isdigit():
+                continue
+            path = os.path.join(directory, name)
+            try:
+                fd = os.open(path, os.O_RDWR)
+            except FileNotFoundError:
+                continue  # Recovered by another worker
+            try:
+                if not _try_lock(fd) or not _is_linked(fd, path):
+                    # Owner alive, or already recovered and replaced by a new owner's journal
+                    continue
+                self._replay(read_journal(path))
+                os.unlink(path)
+            finally:
+                os.close(fd)
+
+    def _replay(self, updates):
+        """Write journaled dates to the store, skipping dates saved again since"""
+        if updates:
+            written = self.store.put_newer(updates)
+            self.recovered_dates += len(written)
+            self.skipped_dates += len(updates) - len(written)
+
+    def _ensure_started(self):
+        """Open this process's journal and start the writer thread if needed"""
+        if self._pid == os.getpid():
+            return
+        # Recovery takes the store lock and may wait for another worker, so
+        # it must not run under the queue lock (see the lock order above)
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # A dead process may have left a journal under a reused pid
+            self.recover()
+            journal_fd = self._open_journal()
+            with self._lock:
+                # Forked from a process that had its own journal and thread
+                self._pending = {}
+                self._oldest = None
+                self._journal_fd = journal_fd
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+            _running.add(self)
+
+    def _open_journal(self):
+        """Open and lock this process's journal
+
+        The lock is held for the life of the journal so recover() in other
+        workers leaves it alone. If another worker is recovering a stale
+        journal under the same name, wait until it has been deleted.
+        """
+        path = self.journal_path()
+        for _ in range(JOURNAL_LOCK_ATTEMPTS):
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            if _try_lock(fd) and _is_linked(fd, path):
+                if os.fstat(fd).st_size:
+                    # Left by a dead process with this pid: write it before reusing the file
+                    self._replay(read_journal(path))
+                    os.ftruncate(fd, 0)
+                return fd
+            os.close(fd)
+            time.sleep(0.1)
+        raise OSError(f"Could not lock write-behind journal {path}")
+
+    def submit(self, date, entries):
+        """Queue a single-date save; returns once it is durable in the journal"""
+        if self._stopped and self._pid == os.getpid():
+            # Stopped (shard closed): write through
+            self.store.put(date, entries)
+            return
+        self._ensure_started()
+        line = (json.dumps([date, entries], separators=(',', ':')) + '\n').encode('utf-8')
+        # Store lock first (as in flush), so a flush never writes half a submit
+        with self.store.reading(), self._lock:
+            os.write(self._journal_fd, line)
+            os.fsync(self._journal_fd)
+            metrics.BYTES_WRITTEN.inc(len(line))
+            self.store.stage(date, entries)
+
+            if date in self._pending:
+                self.coalesced += 1
+                metrics.WRITES_COALESCED.inc()
+            elif not self._pending:
+                self._oldest = time.monotonic()
+            self._pending[date] = entries
+            self.submitted += 1
+            metrics.WRITE_QUEUE_DEPTH.set(len(self._pending))
+        self._wake.set()
+
+    def flush(self):
+        """Write all queued dates to the store now and return how many were written"""
+        with self.store.reading(), self._lock:
+            batch = self._pending
+            if not batch:
+                return 0
+            started = time.perf_counter()
+            try:
+                written = self.store.put_newer(batch)
+            except (IOError, OSError) as e:
+                # Keep the dates queued (and journaled); retry after max_latency
+                self.errors += 1
+                self.last_error = str(e)
+                self._oldest = time.monotonic()
+                raise
+            self.store.unstage(batch)
+            self._pending = {}
+            self._oldest = None
+            # Everything journaled so far is in the store now, or superseded there
+            if self._journal_fd is not None:
+                os.ftruncate(self._journal_fd, 0)
+                os.fsync(self._journal_fd)
+
+            duration = time.perf_counter() - started
+            self.flushes += 1
+            self.flushed_dates += len(written)
+            self.skipped_dates += len(batch) - len(written)
+            self.last_flush_ms = round(duration * 1000, 2)
+            metrics.WRITE_FLUSH_DURATION.observe(duration)
+            metrics.WRITE_FLUSH_DATES.observe(len(written))
+            metrics.WRITE_QUEUE_DEPTH.set(0)
+            return len(written)
+
+    def _run(self):
+        """Flush whenever the oldest queued date is due or a batch is full"""
+        while True:
+            with self._lock:
+                if self._pending:
+                    wait = self._oldest + self.max_latency - time.monotonic()
+                    if len(self._pending) >= self.max_batch:
+                        wait = 0
+                else:
+                    wait = None
+                stopped = self._stopped
+            if stopped and wait is None:
+                return
+            if wait is not None and (wait <= 0 or stopped):
+                try:
+                    self.flush()
+                except (IOError, OSError):
+                    # Recorded in last_error; the dates stay queued and journaled
+                    if stopped:
+                        return
+                continue
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def stop(self):
+        """Flush what is queued and stop the writer thread"""
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=self.max_latency + 30)
+        _running.discard(self)
+        with self._lock:
+            if self._journal_fd is not None and self._pid == os.getpid() and not self._pending:
+                # Unlink while still holding the lock, and only our own file
+                path = self.journal_path()
+                if _is_linked(self._journal_fd, path):
+                    os.unlink(path)
+                os.close(self._journal_fd)
+                self._journal_fd = None
+
+    def stats(self):
+        """Return queue counters for monitoring"""
+        with self._lock:
+            oldest = self._oldest
+            return {
+                'queue_depth': len(self._pending),
+                'oldest_pending_seconds': round(time.monotonic() - oldest, 3) if oldest is not None else None,
+                'max_latency_seconds': self.max_latency,
+                'submitted': self.submitted,
+                'coalesced': self.coalesced,
+                'flushes': self.flushes,
+                'flushed_dates': self.flushed_dates,
+                'last_flush_ms': self.last_flush_ms,
+                'recovered_dates': self.recovered_dates,
+                'skipped_dates': self.skipped_dates,
+                'errors': self.errors,
+                'last_error': self.last_error,
+                'writer_alive': self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+            }